@@ -28,19 +28,20 @@ if [ -d "$OUTPUT_DIR" ]; then
   rm -f "$OUTPUT_DIR"/*.cs
 fi
 
-# Remove the existing Python run config module, so the generated file always matches the current proto schema.
+# Remove the existing Python config modules, so the generated files always match the current proto schemas.
 mkdir -p "$PYTHON_OUTPUT_DIR"
-rm -f "$PYTHON_OUTPUT_DIR/run_config_pb2.py"
+rm -f "$PYTHON_OUTPUT_DIR/run_config_pb2.py" "$PYTHON_OUTPUT_DIR/simulator_config_pb2.py"
 
 # Compile all .proto files needed by Unity from the input directory.
 echo "Compiling Unity .proto files from $INPUT_DIR to $OUTPUT_DIR."
 find "$INPUT_DIR/" -name '*.proto' ! -name 'run_config.proto' -exec protoc --proto_path="$WORKSPACE/Assets/Proto" --csharp_out="$OUTPUT_DIR" {} +
 
-# Compile the Python run config module used by the batch run launcher.
-echo "Compiling Python run_config.proto to $PYTHON_OUTPUT_DIR."
+# Compile the Python config modules used by the batch run launcher.
+echo "Compiling Python run_config.proto and simulator_config.proto to $PYTHON_OUTPUT_DIR."
 protoc \
   --proto_path="$WORKSPACE/Assets/Proto/Configs" \
   --python_out="$PYTHON_OUTPUT_DIR" \
-  "$WORKSPACE/Assets/Proto/Configs/run_config.proto"
+  "$WORKSPACE/Assets/Proto/Configs/run_config.proto" \
+  "$WORKSPACE/Assets/Proto/Configs/simulator_config.proto"
 
 echo "Protobuf compilation completed."
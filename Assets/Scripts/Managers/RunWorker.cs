@@ -1,16 +1,29 @@
 using System;
 using System.Collections;
 using System.IO;
+using System.Net.Sockets;
+using System.Text;
+using System.Threading.Tasks;
 using UnityEngine;
 
-// The run worker executes exactly one seeded simulation run launched externally, e.g., through the
-// Python batch run launcher. It applies the seed, starts the requested simulation configuration,
-// writes logs to the assigned output directory, and quits after the simulation finishes.
+// The run worker executes seeded simulation runs launched externally, e.g., through the Python
+// batch run launcher. It applies the seed, starts the requested simulation configuration, writes
+// logs to the assigned output directory, and quits after the simulation finishes.
+//
+// In persistent mode, the run worker instead connects to the job server of the batch run launcher
+// and executes one run after another without restarting the player. Each job is a tab-separated
+// line containing the run index, the simulation config, the seed, and the output directory. After
+// each run, the run worker replies with a tab-separated line containing the run index and an exit
+// code, which is zero if the run finished successfully. The run worker quits once the job server
+// closes the connection.
 
 public class RunWorker : MonoBehaviour {
   private const string _simulationConfigFlag = "--simulation_config";
   private const string _seedFlag = "--seed";
   private const string _outputDirFlag = "--output_dir";
+  private const string _jobServerFlag = "--job_server";
+
+  private const int _numJobFields = 4;
 
   public static RunWorker Instance { get; private set; }
 
@@ -27,13 +40,27 @@ public class RunWorker : MonoBehaviour {
   // Output directory of the simulation run.
   public static string OutputDirectory { get; private set; }
 
+  // True if the run worker executes multiple runs received from a job server.
+  public static bool IsPersistentMode { get; private set; } = false;
+
   private bool _hasStartedRun = false;
   private bool _hasScheduledQuit = false;
+  private bool _hasEndedRun = false;
+
+  private string _jobServerHost;
+  private int _jobServerPort;
 
   [RuntimeInitializeOnLoadMethod(RuntimeInitializeLoadType.BeforeSceneLoad)]
   private static void OnBeforeSceneLoad() {
-    if (!TryGetWorkerModeArguments(Environment.GetCommandLineArgs(),
-                                   out string simulationConfigFile, out int seed,
+    string[] args = Environment.GetCommandLineArgs();
+    if (TryGetJobServerArgument(args, out string host, out int port)) {
+      var persistentGameObject = new GameObject("RunWorker");
+      DontDestroyOnLoad(persistentGameObject);
+      var persistentRunWorker = persistentGameObject.AddComponent<RunWorker>();
+      persistentRunWorker.InitializePersistent(host, port);
+      return;
+    }
+    if (!TryGetWorkerModeArguments(args, out string simulationConfigFile, out int seed,
                                    out string outputDirectory)) {
       return;
     }
@@ -44,6 +71,51 @@ public class RunWorker : MonoBehaviour {
     runWorker.Initialize(simulationConfigFile, seed, outputDirectory);
   }
 
+  public static bool TryGetJobServerArgument(string[] args, out string host, out int port) {
+    string jobServer = GetArgValue(args, _jobServerFlag);
+    host = null;
+    port = 0;
+
+    if (jobServer == null) {
+      return false;
+    }
+
+    int separatorIndex = jobServer.LastIndexOf(':');
+    if (separatorIndex <= 0 || !int.TryParse(jobServer.Substring(separatorIndex + 1), out port)) {
+      throw new ArgumentException($"Failed to parse job server address: {jobServer}.");
+    }
+    host = jobServer.Substring(0, separatorIndex);
+    return true;
+  }
+
+  public static void ParseJob(string job, out int runIndex, out string simulationConfigFile,
+                              out int seed, out string outputDirectory) {
+    string[] fields = job.Split('\t');
+    if (fields.Length != _numJobFields) {
+      throw new ArgumentException($"Expected {_numJobFields} job fields: {job}.");
+    }
+    if (!int.TryParse(fields[0], out runIndex)) {
+      throw new ArgumentException($"Failed to parse job run index: {fields[0]}.");
+    }
+    if (!int.TryParse(fields[2], out seed)) {
+      throw new ArgumentException($"Failed to parse job seed: {fields[2]}.");
+    }
+    simulationConfigFile = fields[1];
+    if (string.IsNullOrWhiteSpace(simulationConfigFile)) {
+      throw new ArgumentException($"Job requires a simulation config: {job}.");
+    }
+    if (!Path.IsPathRooted(fields[3])) {
+      throw new ArgumentException($"Job output directory must be absolute: {fields[3]}.");
+    }
+    outputDirectory = Path.GetFullPath(fields[3]);
+  }
+
+  public static bool TryParseJobRunIndex(string job, out int runIndex) {
+    int separatorIndex = job.IndexOf('\t');
+    return int.TryParse(separatorIndex >= 0 ? job.Substring(0, separatorIndex) : job,
+                        out runIndex);
+  }
+
   public static bool TryGetWorkerModeArguments(string[] args, out string simulationConfigFile,
                                                out int seed, out string outputDirectory) {
     simulationConfigFile = GetArgValue(args, _simulationConfigFlag);
@@ -88,7 +160,7 @@ public class RunWorker : MonoBehaviour {
     }
 
     Application.targetFrameRate = -1;
-    StartCoroutine(RunWhenReady());
+    StartCoroutine(IsPersistentMode ? RunJobsWhenReady() : RunWhenReady());
   }
 
   private void Initialize(string simulationConfigFile, int seed, string outputDirectory) {
@@ -98,6 +170,13 @@ public class RunWorker : MonoBehaviour {
     OutputDirectory = outputDirectory;
   }
 
+  private void InitializePersistent(string host, int port) {
+    IsWorkerMode = true;
+    IsPersistentMode = true;
+    _jobServerHost = host;
+    _jobServerPort = port;
+  }
+
   private IEnumerator RunWhenReady() {
     while (SimManager.Instance == null) {
       yield return null;
@@ -116,6 +195,88 @@ public class RunWorker : MonoBehaviour {
     SimManager.Instance.LoadNewSimulationConfig(SimulationConfigFile);
   }
 
+  private IEnumerator RunJobsWhenReady() {
+    while (SimManager.Instance == null) {
+      yield return null;
+    }
+
+    SimManager.Instance.AutoRestartOnEnd = false;
+    SimManager.Instance.OnSimulationEnded += RegisterSimulationEnded;
+
+    // Allow scene initialization and manager subscriptions to finish first.
+    yield return null;
+
+    using var client = new TcpClient();
+    client.Connect(_jobServerHost, _jobServerPort);
+    Debug.Log($"Connected to job server {_jobServerHost}:{_jobServerPort}.");
+    using NetworkStream stream = client.GetStream();
+    using var reader = new StreamReader(stream, Encoding.UTF8);
+    using var writer = new StreamWriter(stream, new UTF8Encoding(false)) { AutoFlush = true };
+
+    while (true) {
+      // Wait for the next job without blocking the main thread.
+      Task<string> readTask = reader.ReadLineAsync();
+      while (!readTask.IsCompleted) {
+        yield return null;
+      }
+      string job = readTask.Result;
+      if (string.IsNullOrEmpty(job)) {
+        break;
+      }
+
+      int exitCode = TryStartJob(job, out int runIndex);
+      if (exitCode == 0) {
+        while (!_hasEndedRun) {
+          yield return null;
+        }
+        // Allow end-of-run cleanup, such as log flushing, to complete first.
+        yield return null;
+      }
+      writer.WriteLine($"{runIndex}\t{exitCode}");
+    }
+
+    Debug.Log("Job server closed the connection.");
+    SimManager.Instance.QuitSimulation();
+  }
+
+  // Parses and starts the given job and returns a non-zero exit code if the job failed to start.
+  // The job server always receives a reply, so a malformed job cannot stall the batch.
+  private int TryStartJob(string job, out int runIndex) {
+    try {
+      ParseJob(job, out runIndex, out string simulationConfigFile, out int seed,
+               out string outputDirectory);
+      SimulationConfigFile = simulationConfigFile;
+      Seed = seed;
+      OutputDirectory = outputDirectory;
+      return StartJob();
+    } catch (Exception e) {
+      Debug.LogException(e);
+      _hasStartedRun = false;
+      runIndex = TryParseJobRunIndex(job, out int jobRunIndex) ? jobRunIndex : -1;
+      return 1;
+    }
+  }
+
+  // Starts the current job and returns a non-zero exit code if the job failed to start.
+  private int StartJob() {
+    try {
+      PrepareOutputDirectory();
+    } catch (IOException e) {
+      Debug.LogError(e.Message);
+      return 1;
+    }
+    UnityEngine.Random.InitState(Seed);
+    _hasStartedRun = true;
+    _hasEndedRun = false;
+    Debug.Log($"Starting run with simulation config {SimulationConfigFile} and seed {Seed}.");
+    SimManager.Instance.LoadNewSimulationConfig(SimulationConfigFile);
+    if (SimManager.Instance.SimulationConfig == null) {
+      _hasStartedRun = false;
+      return 1;
+    }
+    return 0;
+  }
+
   private void PrepareOutputDirectory() {
     if (Directory.Exists(OutputDirectory)) {
       throw new IOException(
@@ -125,6 +286,13 @@ public class RunWorker : MonoBehaviour {
   }
 
   private void RegisterSimulationEnded() {
+    if (IsPersistentMode) {
+      if (_hasStartedRun) {
+        _hasStartedRun = false;
+        _hasEndedRun = true;
+      }
+      return;
+    }
     if (!_hasStartedRun || _hasScheduledQuit) {
       return;
     }
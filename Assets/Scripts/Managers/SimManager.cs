@@ -410,7 +410,7 @@ public class SimManager : MonoBehaviour {
       return true;
     }
     // A worker run can end early once all spawned threats have been terminated.
-    if (RunWorker.IsWorkerMode && _numThreatsSpawned > 0 &&
+    if (IsRunning && RunWorker.IsWorkerMode && _numThreatsSpawned > 0 &&
         _numThreatsTerminated >= _numThreatsSpawned) {
       return true;
     }
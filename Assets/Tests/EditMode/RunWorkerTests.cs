@@ -18,4 +18,53 @@ public class RunWorkerTests {
     Assert.AreEqual(203, seed);
     Assert.AreEqual(Path.GetFullPath(outputDirectory), outputDirectoryArg);
   }
+
+  [Test]
+  public void TryGetJobServerArgumentParsesAddress() {
+    string[] args = { "micromissiles", "--job_server", "127.0.0.1:50123" };
+
+    bool isPersistentMode = RunWorker.TryGetJobServerArgument(args, out string host, out int port);
+
+    Assert.IsTrue(isPersistentMode);
+    Assert.AreEqual("127.0.0.1", host);
+    Assert.AreEqual(50123, port);
+  }
+
+  [Test]
+  public void TryGetJobServerArgumentReturnsFalseWithoutFlag() {
+    string[] args = { "micromissiles", "--seed", "203" };
+
+    Assert.IsFalse(RunWorker.TryGetJobServerArgument(args, out _, out _));
+  }
+
+  [Test]
+  public void ParseJobParsesTabSeparatedFields() {
+    string outputDirectory = Path.Combine(Path.GetTempPath(), "worker run");
+    string job = $"4\t7_ucav.pbtxt\t203\t{outputDirectory}";
+
+    RunWorker.ParseJob(job, out int runIndex, out string simulationConfigFile, out int seed,
+                       out string outputDirectoryArg);
+
+    Assert.AreEqual(4, runIndex);
+    Assert.AreEqual("7_ucav.pbtxt", simulationConfigFile);
+    Assert.AreEqual(203, seed);
+    Assert.AreEqual(Path.GetFullPath(outputDirectory), outputDirectoryArg);
+  }
+
+  [Test]
+  public void ParseJobRejectsRelativeOutputDirectory() {
+    Assert.Throws<System.ArgumentException>(
+        () => RunWorker.ParseJob("4\t7_ucav.pbtxt\t203\tworker_run", out _, out _, out _, out _));
+  }
+
+  [Test]
+  public void TryParseJobRunIndexParsesMalformedJob() {
+    Assert.IsTrue(RunWorker.TryParseJobRunIndex("4\t7_ucav.pbtxt", out int runIndex));
+    Assert.AreEqual(4, runIndex);
+  }
+
+  [Test]
+  public void TryParseJobRunIndexRejectsInvalidRunIndex() {
+    Assert.IsFalse(RunWorker.TryParseJobRunIndex("run\t7_ucav.pbtxt\t203", out _));
+  }
 }
@@ -1,6 +1,6 @@
 """An aggregator combines metrics over multiple simulation runs."""
 
-import pandas as pd
+from event_summary import BatchEventSummary, EventSummary
 from metric import Metric
 from multi_metric import MultiMetric
 from scalar_metric import ScalarMetric
@@ -9,22 +9,34 @@ from scalar_metric import ScalarMetric
 class Aggregator:
     """An aggregator combines metrics over multiple simulation runs.
 
+    If the event summaries are given as a batch event summary, the aggregator
+    uses the grouped implementation of the metric if available and falls back
+    to evaluating the metric for each run individually otherwise.
+
     Attributes:
         values: Aggregated metric values.
     """
 
     def __init__(
         self,
-        event_dfs: list[pd.DataFrame],
+        summaries: list[EventSummary] | BatchEventSummary,
         metric: Metric,
     ):
+        if not isinstance(metric, (ScalarMetric, MultiMetric)):
+            raise TypeError(f"Unsupported metric type: "
+                            f"{type(metric).__name__}.")
+        if isinstance(summaries, BatchEventSummary):
+            if metric.supports_batch_evaluation:
+                values = metric.evaluate_batch(summaries)
+                self.values = (values.tolist() if isinstance(
+                    metric, ScalarMetric) else values)
+                return
+            summaries = summaries.run_summaries
+
         if isinstance(metric, ScalarMetric):
-            self.values = [metric.emit(event_df) for event_df in event_dfs]
-        elif isinstance(metric, MultiMetric):
+            self.values = [metric.evaluate(summary) for summary in summaries]
+        else:
             self.values = [
-                value for event_df in event_dfs
-                for value in metric.emit(event_df)
+                value for summary in summaries
+                for value in metric.evaluate(summary)
             ]
-        else:
-            raise TypeError(f"Unsupported metric type: "
-                            f"{type(metric).__name__}.")
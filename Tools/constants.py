@@ -14,6 +14,19 @@ class AgentType(StrEnum):
     ROTARY_WING_THREAT = "RotaryWingThreat"
 
 
+# Map from the integer agent type in the binary telemetry file to the agent
+# type. The integer values follow the AgentType enumeration in
+# static_config.proto.
+AGENT_TYPE_FROM_VALUE = {
+    2: AgentType.VESSEL,
+    3: AgentType.SHORE_BATTERY,
+    4: AgentType.CARRIER_INTERCEPTOR,
+    5: AgentType.MISSILE_INTERCEPTOR,
+    6: AgentType.FIXED_WING_THREAT,
+    7: AgentType.ROTARY_WING_THREAT,
+}
+
+
 class EventType(StrEnum):
     """Event type enumeration."""
     NEW_INTERCEPTOR = "NEW_INTERCEPTOR"
@@ -38,13 +51,49 @@ class Column(StrEnum):
     VELOCITY_Y = "VelocityY"
     VELOCITY_Z = "VelocityZ"
 
+    # Run index of the event in a table stacking the events of multiple runs.
+    RUN_INDEX = "RunIndex"
+
+
+class RunStatus(StrEnum):
+    """Status of a simulation run in a batch."""
+    COMPLETED = "completed"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+    # The output directory of the run has been moved into a merged batch.
+    MERGED = "merged"
+
 
 # Telemetry file prefix.
 TELEMETRY_FILE_PREFIX = "sim_telemetry"
 
+# Binary telemetry file extension.
+TELEMETRY_BINARY_FILE_EXTENSION = ".bin"
+
+# CSV telemetry file extension.
+TELEMETRY_CSV_FILE_EXTENSION = ".csv"
+
+# Telemetry file extensions in order of preference.
+TELEMETRY_FILE_EXTENSIONS = (
+    TELEMETRY_BINARY_FILE_EXTENSION,
+    TELEMETRY_CSV_FILE_EXTENSION,
+)
+
 # Event log prefix.
 EVENT_LOG_FILE_PREFIX = "sim_events"
 
+# Event log cache file within a log directory.
+EVENT_LOG_CACHE_FILE = "sim_events_cache.npz"
+
+# Batch manifest file within a batch output directory.
+BATCH_MANIFEST_FILE = "batch_manifest.json"
+
+# Batch manifest file in CSV format within a batch output directory.
+BATCH_MANIFEST_CSV_FILE = "batch_manifest.csv"
+
+# Batch status file with the live progress within a batch output directory.
+BATCH_STATUS_FILE = "batch_status.json"
+
 
 def is_interceptor(agent_type: str) -> bool:
     """Returns whether the given agent type is an interceptor."""
@@ -2,21 +2,60 @@
 runs that analyzes the statistics of the values.
 """
 
+import concurrent.futures
+
 import numpy as np
-import pandas as pd
 from aggregator import Aggregator
+from event_summary import BatchEventSummary, EventSummary
 from scalar_metric import ScalarMetric
 
+# Maximum number of elements in a bootstrap resample matrix chunk.
+_MAX_BOOTSTRAP_CHUNK_SIZE = 1 << 22
+
+# Minimum number of resampled elements per worker process for which the
+# bootstrap is parallelized.
+_MIN_BOOTSTRAP_SIZE_PER_WORKER = 1 << 24
+
+
+def _bootstrap_means(
+    values: np.ndarray,
+    num_resamples: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Computes the means of bootstrap resamples of the values.
+
+    Each chunk of resamples is drawn as a single resample matrix of indices,
+    so the means of all resamples in the chunk are computed in one vectorized
+    operation.
+
+    Args:
+        values: Values to resample.
+        num_resamples: Number of bootstrap resamples.
+        seed: Seed of the random number generator.
+
+    Returns:
+        An array of shape (num_resamples,) containing the resample means.
+    """
+    rng = np.random.default_rng(seed)
+    num_values = len(values)
+    chunk_size = max(_MAX_BOOTSTRAP_CHUNK_SIZE // num_values, 1)
+    means = np.empty(num_resamples)
+    for start in range(0, num_resamples, chunk_size):
+        end = min(start + chunk_size, num_resamples)
+        indices = rng.integers(num_values, size=(end - start, num_values))
+        means[start:end] = values[indices].mean(axis=1)
+    return means
+
 
 class Distribution(Aggregator):
     """A distribution analyzes the statistics of scalar metric values."""
 
     def __init__(
         self,
-        event_dfs: list[pd.DataFrame],
+        summaries: list[EventSummary] | BatchEventSummary,
         metric: ScalarMetric,
     ):
-        super().__init__(event_dfs, metric)
+        super().__init__(summaries, metric)
 
     def min(self) -> float:
         """Returns the minimum of the metric values."""
@@ -41,3 +80,55 @@ class Distribution(Aggregator):
     def std(self) -> float:
         """Returns the standard deviation of the metric values."""
         return np.std(self.values)
+
+    def bootstrap_confidence_interval(
+        self,
+        confidence_level: float = 0.95,
+        num_resamples: int = 10000,
+        num_workers: int = 1,
+        seed: int | None = None,
+    ) -> tuple[float, float]:
+        """Returns the bootstrap confidence interval of the mean.
+
+        The confidence interval is computed with the percentile method. The
+        resamples are optionally sharded across worker processes, each with an
+        independent random number generator.
+
+        Args:
+            confidence_level: Confidence level of the interval.
+            num_resamples: Number of bootstrap resamples.
+            num_workers: Maximum number of worker processes.
+            seed: Seed of the random number generator.
+
+        Returns:
+            A tuple of the lower and upper bounds of the confidence interval.
+
+        Raises:
+            ValueError: If the list of metric values is empty.
+        """
+        if not self.values:
+            raise ValueError("The list of metric values is empty.")
+        values = np.asarray(self.values, dtype=np.float64)
+        num_workers = max(
+            min(
+                num_workers,
+                num_resamples * len(values) // _MIN_BOOTSTRAP_SIZE_PER_WORKER,
+            ), 1)
+        shard_sizes = [
+            len(shard)
+            for shard in np.array_split(np.arange(num_resamples), num_workers)
+        ]
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+        if num_workers > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                    num_workers) as executor:
+                means = np.concatenate(
+                    list(
+                        executor.map(_bootstrap_means, [values] * num_workers,
+                                     shard_sizes, seeds)))
+        else:
+            means = _bootstrap_means(values, num_resamples, seeds[0])
+
+        alpha = 1 - confidence_level
+        lower, upper = np.quantile(means, [alpha / 2, 1 - alpha / 2])
+        return lower, upper
@@ -0,0 +1,215 @@
+"""An event summary holds the intermediate results of a single simulation run
+that are shared by all metrics.
+
+A batch event summary holds the intermediate results of all simulation runs in
+a batch, so that metrics can be evaluated for all runs at once.
+"""
+
+import numpy as np
+import pandas as pd
+from constants import Column
+
+
+class EventSummary:
+    """An event summary holds the intermediate results of a single simulation
+    run that are shared by all metrics.
+
+    The events are grouped by agent type and event type in a single pass over
+    the event log, so each metric only looks up the groups that it needs
+    instead of scanning the entire event log.
+
+    Attributes:
+        event_df: Dataframe containing the events.
+    """
+
+    def __init__(self, event_df: pd.DataFrame):
+        self.event_df = event_df
+
+        # Map from the agent type and the event type to the row indices of the
+        # corresponding events.
+        self._group_indices: dict[tuple[str, str],
+                                  np.ndarray] = (event_df.groupby(
+                                      [Column.AGENT_TYPE, Column.EVENT],
+                                      sort=False,
+                                  ).indices if not event_df.empty else {})
+        self._positions = event_df[[
+            Column.POSITION_X,
+            Column.POSITION_Y,
+            Column.POSITION_Z,
+        ]].to_numpy()
+
+    def count(self, event_type: str, agent_type: str | None = None) -> int:
+        """Returns the number of events of the given type.
+
+        Args:
+            event_type: Event type.
+            agent_type: Agent type. If None, events of all agent types are
+                counted.
+        """
+        return len(self.indices(event_type, agent_type))
+
+    def indices(
+        self,
+        event_type: str,
+        agent_type: str | None = None,
+    ) -> np.ndarray:
+        """Returns the row indices of the events of the given type in
+        chronological order.
+
+        Args:
+            event_type: Event type.
+            agent_type: Agent type. If None, events of all agent types are
+                returned.
+        """
+        if agent_type is not None:
+            return self._group_indices.get((agent_type, event_type),
+                                           np.empty(0, dtype=np.int64))
+        group_indices = [
+            indices
+            for (_, group_event_type), indices in self._group_indices.items()
+            if group_event_type == event_type
+        ]
+        if not group_indices:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(group_indices))
+
+    def positions(
+        self,
+        event_type: str,
+        agent_type: str | None = None,
+    ) -> np.ndarray:
+        """Returns the positions of the events of the given type in
+        chronological order.
+
+        Args:
+            event_type: Event type.
+            agent_type: Agent type. If None, events of all agent types are
+                returned.
+
+        Returns:
+            An array of shape (num_events, 3) containing the 3D positions.
+        """
+        return self._positions[self.indices(event_type, agent_type)]
+
+
+class BatchEventSummary:
+    """A batch event summary holds the intermediate results of all simulation
+    runs in a batch.
+
+    The events of all runs are stacked into a single event table with an
+    additional run index column. The number of events per run, agent type, and
+    event type is counted with a single np.bincount call, so metrics can
+    compute their values for all runs in a few vectorized operations.
+
+    Attributes:
+        event_df: Dataframe containing the events of all runs.
+        num_runs: Number of simulation runs.
+    """
+
+    def __init__(self, event_dfs: list[pd.DataFrame]):
+        self._event_dfs = event_dfs
+        self._run_summaries: list[EventSummary] | None = None
+        self.num_runs = len(event_dfs)
+
+        run_indices = np.repeat(
+            np.arange(self.num_runs),
+            [len(event_df) for event_df in event_dfs],
+        )
+        self.event_df = (pd.concat(event_dfs, ignore_index=True)
+                         if event_dfs else pd.DataFrame(columns=list(Column)))
+        self.event_df[Column.RUN_INDEX] = run_indices
+        self._run_indices = run_indices
+
+        # Encode the agent types and event types as integers.
+        self._agent_type_codes, agent_types = pd.factorize(
+            self.event_df[Column.AGENT_TYPE])
+        self._event_type_codes, event_types = pd.factorize(
+            self.event_df[Column.EVENT])
+        self._agent_type_to_code = {
+            agent_type: code for code, agent_type in enumerate(agent_types)
+        }
+        self._event_type_to_code = {
+            event_type: code for code, event_type in enumerate(event_types)
+        }
+
+        # Count the events per run, agent type, and event type. Events with a
+        # missing agent type or event type are not counted.
+        num_agent_types = len(agent_types)
+        num_event_types = len(event_types)
+        is_valid = (self._agent_type_codes >= 0) & (self._event_type_codes >= 0)
+        flat_indices = (
+            (run_indices * num_agent_types + self._agent_type_codes) *
+            num_event_types + self._event_type_codes)[is_valid]
+        self._counts = np.bincount(
+            flat_indices,
+            minlength=self.num_runs * num_agent_types * num_event_types,
+        ).reshape(self.num_runs, num_agent_types, num_event_types)
+
+        self._positions = self.event_df[[
+            Column.POSITION_X,
+            Column.POSITION_Y,
+            Column.POSITION_Z,
+        ]].to_numpy(dtype=np.float64)
+
+    @property
+    def run_summaries(self) -> list[EventSummary]:
+        """Returns the event summary of each simulation run.
+
+        The event summaries are only created when they are first needed.
+        """
+        if self._run_summaries is None:
+            self._run_summaries = [
+                EventSummary(event_df) for event_df in self._event_dfs
+            ]
+        return self._run_summaries
+
+    def counts(
+        self,
+        event_type: str,
+        agent_type: str | None = None,
+    ) -> np.ndarray:
+        """Returns the number of events of the given type in each run.
+
+        Args:
+            event_type: Event type.
+            agent_type: Agent type. If None, events of all agent types are
+                counted.
+
+        Returns:
+            An array of shape (num_runs,) containing the number of events.
+        """
+        event_type_code = self._event_type_to_code.get(event_type)
+        if event_type_code is None:
+            return np.zeros(self.num_runs, dtype=np.int64)
+        if agent_type is None:
+            return self._counts[:, :, event_type_code].sum(axis=1)
+        agent_type_code = self._agent_type_to_code.get(agent_type)
+        if agent_type_code is None:
+            return np.zeros(self.num_runs, dtype=np.int64)
+        return self._counts[:, agent_type_code, event_type_code]
+
+    def positions(
+        self,
+        event_type: str,
+        agent_type: str | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the positions of the events of the given type in all runs.
+
+        The events are ordered by run and then chronologically.
+
+        Args:
+            event_type: Event type.
+            agent_type: Agent type. If None, events of all agent types are
+                returned.
+
+        Returns:
+            A tuple of an array of shape (num_events,) containing the run index
+            of each event and an array of shape (num_events, 3) containing the
+            3D positions.
+        """
+        mask = self._event_type_codes == self._event_type_to_code.get(
+            event_type, -2)
+        if agent_type is not None:
+            mask &= self._agent_type_codes == self._agent_type_to_code.get(
+                agent_type, -2)
+        return self._run_indices[mask], self._positions[mask]
@@ -0,0 +1,165 @@
+"""Merges the shards of a batch run on multiple hosts into a single batch."""
+
+import dataclasses
+import datetime
+import shutil
+from pathlib import Path
+
+import run_batch
+from absl import app, flags, logging
+from constants import RunStatus
+
+FLAGS = flags.FLAGS
+
+
+def _load_shard_manifests(
+        shard_dirs: list[Path]) -> list[run_batch.BatchManifest]:
+    """Loads the batch manifests of all shards in the order of the shard index.
+
+    Args:
+        shard_dirs: Batch output directories of the shards.
+
+    Returns:
+        The list of batch manifests ordered by the shard index.
+
+    Raises:
+        FileNotFoundError: If a shard has no batch manifest.
+        ValueError: If the shards are inconsistent or a shard is missing.
+    """
+    manifests = []
+    for shard_dir in shard_dirs:
+        manifest = run_batch.BatchManifest(shard_dir)
+        if not manifest.path.exists():
+            raise FileNotFoundError(
+                f"Batch manifest not found: {manifest.path}.")
+        manifests.append(manifest)
+
+    num_shards = len(shard_dirs)
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        if manifest.num_shards != num_shards:
+            raise ValueError(
+                f"Shard {shard_dir} is one of {manifest.num_shards} shards, "
+                f"but {num_shards} shards were given.")
+    shard_indices = sorted(manifest.shard_index for manifest in manifests)
+    if shard_indices != list(range(num_shards)):
+        missing_shard_indices = set(range(num_shards)) - set(shard_indices)
+        raise ValueError(
+            f"Shards {sorted(missing_shard_indices)} are missing, and shards "
+            f"{shard_indices} were given.")
+    return sorted(manifests, key=lambda manifest: manifest.shard_index)
+
+
+def merge_batch_shards(
+    run_config_path: Path,
+    shard_dirs: list[Path],
+    batch_output_dir: Path,
+    copy: bool = False,
+) -> None:
+    """Merges the shards of a batch into a single batch output directory.
+
+    The runs of the whole batch are planned again from the run configuration,
+    and each planned run must have completed successfully in the shard to
+    which it is assigned. The run output directories are then moved or copied
+    into the merged batch output directory, and a merged batch manifest is
+    written, so the merged batch can be processed like a batch run on a single
+    host. If the run output directories are moved, the runs are marked as
+    merged in the batch manifest of their shard, so the shard no longer lists
+    them as completed.
+
+    Args:
+        run_config_path: Path to the run configuration file.
+        shard_dirs: Batch output directories of the shards.
+        batch_output_dir: Merged batch output directory.
+        copy: If true, copy the run output directories instead of moving them.
+
+    Raises:
+        FileNotFoundError: If a shard has no batch manifest.
+        ValueError: If a shard is missing, the shards are inconsistent, or a
+            run is missing or has not completed successfully.
+    """
+    run_config = run_batch.parse_run_config(run_config_path)
+    manifests = _load_shard_manifests(shard_dirs)
+    num_shards = len(manifests)
+
+    # Validate that every planned run has completed in its shard.
+    shard_descriptors = []
+    num_runs = 0
+    incomplete_run_indices = []
+    for manifest in manifests:
+        shard_dir = manifest.path.parent
+        descriptors = run_batch.shard_run_descriptors(
+            run_batch.plan_run_descriptors(run_config, shard_dir),
+            manifest.shard_index, num_shards)
+        num_runs += len(descriptors)
+        for descriptor in descriptors:
+            record = manifest.runs.get(descriptor.run_index)
+            if (record is None or record.seed != descriptor.seed or
+                    record.status != RunStatus.COMPLETED or
+                    not descriptor.output_dir.is_dir()):
+                incomplete_run_indices.append(descriptor.run_index)
+        shard_descriptors.append(descriptors)
+    if incomplete_run_indices:
+        raise ValueError(
+            f"{len(incomplete_run_indices)} of {num_runs} runs are "
+            f"missing or have not completed successfully: "
+            f"{', '.join(map(str, sorted(incomplete_run_indices)))}.")
+
+    batch_output_dir.mkdir(parents=True, exist_ok=False)
+    merged_manifest = run_batch.BatchManifest(batch_output_dir)
+    for manifest, descriptors in zip(manifests, shard_descriptors):
+        shard_dir = manifest.path.parent
+        logging.info("Merging %d runs of shard %d from %s.", len(descriptors),
+                     manifest.shard_index, shard_dir)
+        for descriptor in descriptors:
+            output_dir = batch_output_dir / descriptor.output_dir.relative_to(
+                shard_dir)
+            output_dir.parent.mkdir(parents=True, exist_ok=True)
+            record = manifest.runs[descriptor.run_index]
+            merged_manifest.runs[descriptor.run_index] = dataclasses.replace(
+                record)
+            if copy:
+                shutil.copytree(descriptor.output_dir, output_dir)
+            else:
+                shutil.move(descriptor.output_dir, output_dir)
+                record.status = RunStatus.MERGED
+        if not copy:
+            manifest.save()
+    merged_manifest.save()
+
+
+def main(argv):
+    assert len(argv) == 1, argv
+
+    run_config_path = run_batch.resolve_run_config_path(FLAGS.run_config)
+    shard_dirs = [
+        Path(shard_dir).expanduser().resolve() for shard_dir in FLAGS.shard_dirs
+    ]
+    if FLAGS.output_dir is not None:
+        batch_output_dir = Path(FLAGS.output_dir).expanduser().resolve()
+    else:
+        run_config = run_batch.parse_run_config(run_config_path)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        batch_output_dir = shard_dirs[0].parent / (
+            f"{run_config.name}_{timestamp}")
+
+    merge_batch_shards(run_config_path, shard_dirs, batch_output_dir,
+                       FLAGS.copy)
+    logging.info("Merged %d shards into %s.", len(shard_dirs), batch_output_dir)
+
+
+if __name__ == "__main__":
+    flags.DEFINE_string("run_config", None,
+                        "Run configuration path or filename.")
+    flags.DEFINE_list(
+        "shard_dirs", None,
+        "Comma-separated batch output directories of the shards.")
+    flags.DEFINE_string(
+        "output_dir", None,
+        "Merged batch output directory. Defaults to a new batch output "
+        "directory next to the first shard.")
+    flags.DEFINE_bool(
+        "copy", False,
+        "If true, copy the run output directories instead of moving them.")
+    flags.mark_flags_as_required(["run_config", "shard_dirs"])
+
+    app.run(main)
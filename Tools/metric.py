@@ -4,6 +4,7 @@ from abc import ABC, abstractmethod
 from typing import Any
 
 import pandas as pd
+from event_summary import BatchEventSummary, EventSummary
 
 
 class Metric(ABC):
@@ -14,10 +15,45 @@ class Metric(ABC):
     def name(self) -> str:
         """Returns the name of the metric."""
 
-    @abstractmethod
     def emit(self, event_df: pd.DataFrame) -> Any:
         """Emits the metric from the given event log.
 
         Args:
             event_df: Dataframe containing the events.
         """
+        return self.evaluate(EventSummary(event_df))
+
+    @abstractmethod
+    def evaluate(self, summary: EventSummary) -> Any:
+        """Evaluates the metric from the given event summary.
+
+        Args:
+            summary: Event summary of a single simulation run.
+        """
+
+    @property
+    def supports_batch_evaluation(self) -> bool:
+        """Returns whether the metric overrides evaluate_batch() with a grouped
+        implementation."""
+        return type(self).evaluate_batch is not Metric.evaluate_batch
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> Any:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Metrics may override this method with a grouped implementation over
+        the stacked event table. Aggregators fall back to evaluating the metric
+        for each run individually otherwise.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+
+        Returns:
+            For a scalar metric, an array of shape (num_runs,) containing the
+            metric value of each run. For a multi-metric, the concatenated
+            metric values of all runs in run order.
+
+        Raises:
+            NotImplementedError: If the metric has no grouped implementation.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support batch evaluation.")
@@ -7,8 +7,8 @@ from abc import abstractmethod
 from typing import Any
 
 import numpy as np
-import pandas as pd
-from constants import AgentType, Column, EventType
+from constants import AgentType, EventType
+from event_summary import BatchEventSummary, EventSummary
 from metric import Metric
 
 
@@ -16,11 +16,11 @@ class MultiMetric(Metric):
     """A multi-metric represents multiple outputs from a single simulation run."""
 
     @abstractmethod
-    def emit(self, event_df: pd.DataFrame) -> list[Any]:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> list[Any]:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
 
 
@@ -35,22 +35,27 @@ class InterceptPosition2D(MultiMetric):
         """Returns the name of the metric."""
         return "Intercept positions (2D)"
 
-    def emit(self, event_df: pd.DataFrame) -> list[np.ndarray]:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> list[np.ndarray]:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
 
         Returns:
             An array of shape (num_hits, 2) containing the 2D positions (x, z).
         """
-        interceptor_hits = (
-            event_df[event_df[Column.EVENT] == EventType.INTERCEPTOR_HIT])
-        interceptor_hit_positions = interceptor_hits[[
-            Column.POSITION_X,
-            Column.POSITION_Z,
-        ]]
-        return list(interceptor_hit_positions.to_numpy())
+        interceptor_hit_positions = summary.positions(EventType.INTERCEPTOR_HIT)
+        return list(interceptor_hit_positions[:, [0, 2]])
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> list[np.ndarray]:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        _, interceptor_hit_positions = summary.positions(
+            EventType.INTERCEPTOR_HIT)
+        return list(interceptor_hit_positions[:, [0, 2]])
 
 
 class MissileInterceptorSpawnPosition2D(MultiMetric):
@@ -64,21 +69,26 @@ class MissileInterceptorSpawnPosition2D(MultiMetric):
         """Returns the name of the metric."""
         return "Missile interceptor spawn positions (2D)"
 
-    def emit(self, event_df: pd.DataFrame) -> list[np.ndarray]:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> list[np.ndarray]:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
 
         Returns:
             An array of shape (num_interceptors, 2) containing the 2D positions
             (x, z).
         """
-        new_missile_interceptors = event_df[
-            (event_df[Column.AGENT_TYPE] == AgentType.MISSILE_INTERCEPTOR) &
-            (event_df[Column.EVENT] == EventType.NEW_INTERCEPTOR)]
-        missile_interceptor_spawn_positions = new_missile_interceptors[[
-            Column.POSITION_X,
-            Column.POSITION_Z,
-        ]]
-        return list(missile_interceptor_spawn_positions.to_numpy())
+        missile_interceptor_spawn_positions = summary.positions(
+            EventType.NEW_INTERCEPTOR, AgentType.MISSILE_INTERCEPTOR)
+        return list(missile_interceptor_spawn_positions[:, [0, 2]])
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> list[np.ndarray]:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        _, missile_interceptor_spawn_positions = summary.positions(
+            EventType.NEW_INTERCEPTOR, AgentType.MISSILE_INTERCEPTOR)
+        return list(missile_interceptor_spawn_positions[:, [0, 2]])
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10run_config.proto\x12\x07\x63onfigs\"\x84\x01\n\tRunConfig\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x1e\n\x16simulation_config_file\x18\x02 \x01(\t\x12\x10\n\x08num_runs\x18\x03 \x01(\r\x12\x0c\n\x04seed\x18\x04 \x01(\x05\x12\x13\n\x0bseed_stride\x18\x05 \x01(\x05\x12\x14\n\x0cmax_parallel\x18\x06 \x01(\rb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10run_config.proto\x12\x07\x63onfigs\"\xda\x01\n\tRunConfig\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x1e\n\x16simulation_config_file\x18\x02 \x01(\t\x12\x10\n\x08num_runs\x18\x03 \x01(\r\x12\x0c\n\x04seed\x18\x04 \x01(\x05\x12\x13\n\x0bseed_stride\x18\x05 \x01(\x05\x12\x14\n\x0cmax_parallel\x18\x06 \x01(\r\x12%\n\x1dsweep_simulation_config_files\x18\x07 \x03(\t\x12-\n\x11sweep_seed_ranges\x18\x08 \x03(\x0b\x32\x12.configs.SeedRange\"@\n\tSeedRange\x12\x10\n\x08num_runs\x18\x01 \x01(\r\x12\x0c\n\x04seed\x18\x02 \x01(\x05\x12\x13\n\x0bseed_stride\x18\x03 \x01(\x05\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,5 +32,7 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'run_config_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_RUNCONFIG']._serialized_start=30
-  _globals['_RUNCONFIG']._serialized_end=162
+  _globals['_RUNCONFIG']._serialized_end=248
+  _globals['_SEEDRANGE']._serialized_start=250
+  _globals['_SEEDRANGE']._serialized_end=314
 # @@protoc_insertion_point(module_scope)
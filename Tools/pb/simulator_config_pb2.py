@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: simulator_config.proto
+# Protobuf Python Version: 7.34.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    34,
+    1,
+    '',
+    'simulator_config.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x16simulator_config.proto\x12\x07\x63onfigs\"\xd6\x01\n\x0fSimulatorConfig\x12 \n\x18\x65nable_telemetry_logging\x18\x01 \x01(\x08\x12\x1c\n\x14\x65nable_event_logging\x18\x02 \x01(\x08\x12#\n\x1b\x65nable_missile_trail_effect\x18\x03 \x01(\x08\x12\x1f\n\x17\x65nable_explosion_effect\x18\x04 \x01(\x08\x12\x1b\n\x13physics_update_rate\x18\x05 \x01(\x02\x12 \n\x18persistent_flight_trails\x18\x06 \x01(\x08\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'simulator_config_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_SIMULATORCONFIG']._serialized_start=36
+  _globals['_SIMULATORCONFIG']._serialized_end=250
+# @@protoc_insertion_point(module_scope)
@@ -1,5 +1,12 @@
 """Processes the logs of a simulation run."""
 
+import fnmatch
+import json
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import mpl_config
 import multi_metric
@@ -10,7 +17,10 @@ import unity_utils
 import utils
 from absl import app, flags, logging
 from aggregator import Aggregator
+from constants import BATCH_STATUS_FILE, EVENT_LOG_FILE_PREFIX
 from distribution import Distribution
+from event_summary import BatchEventSummary, EventSummary
+from streaming_distribution import StreamingDistribution
 
 FLAGS = flags.FLAGS
 
@@ -35,41 +45,247 @@ MULTI_METRICS = [
 ]
 
 
-def print_aggregated_stats(event_dfs: list[pd.DataFrame]) -> None:
+def print_aggregated_stats(
+    summary: BatchEventSummary,
+    num_workers: int = 1,
+) -> None:
     """Prints the aggregated statistics of the simulation run.
 
+    Unless disabled, the bootstrap confidence interval of the mean is reported
+    alongside the mean and the standard deviation.
+
     Args:
-        event_dfs: List of dataframes containing the events.
+        summary: Batch event summary of all simulation runs.
+        num_workers: Maximum number of worker processes for the bootstrap.
     """
-    if not event_dfs:
+    if summary.num_runs == 0:
         logging.warning("No simulation runs to aggregate stats.")
         return
 
-    num_runs = len(event_dfs)
+    num_runs = summary.num_runs
     logging.info(
         "Aggregating the stats for %d runs found in the log directory.",
         num_runs)
 
     for metric in SCALAR_METRICS:
-        distribution = Distribution(event_dfs, metric)
+        distribution = Distribution(summary, metric)
         mean = distribution.mean()
         std = distribution.std()
-        logging.info("  %s: mean: %f, std: %f.", metric.name, mean, std)
+        if FLAGS.num_bootstrap_resamples == 0:
+            logging.info("  %s: mean: %f, std: %f.", metric.name, mean, std)
+            continue
+        lower, upper = distribution.bootstrap_confidence_interval(
+            FLAGS.confidence_level, FLAGS.num_bootstrap_resamples, num_workers)
+        logging.info("  %s: mean: %f (%g%% CI: [%f, %f]), std: %f.",
+                     metric.name, mean, FLAGS.confidence_level * 100, lower,
+                     upper, std)
+
+
+class RunningStats:
+    """Running statistics of the metrics over the simulation runs processed so
+    far.
+
+    The scalar metrics are aggregated by streaming distributions, so the
+    event logs can be discarded once they have been folded in.
+
+    Attributes:
+        distributions: Streaming distributions of the scalar metrics.
+        multi_metric_values: Aggregated values of each multi-metric.
+    """
+
+    def __init__(self):
+        self.distributions = [
+            StreamingDistribution(metric) for metric in SCALAR_METRICS
+        ]
+        self.multi_metric_values = [[] for _ in MULTI_METRICS]
+
+    @property
+    def num_runs(self) -> int:
+        """Returns the number of simulation runs folded in."""
+        return self.distributions[0].count
+
+    def fold(self, event_df: pd.DataFrame) -> None:
+        """Folds the metrics of a simulation run into the running statistics.
+
+        Args:
+            event_df: Dataframe containing the events of the simulation run.
+        """
+        summary = EventSummary(event_df)
+        for distribution in self.distributions:
+            distribution.update(summary)
+        for metric, values in zip(MULTI_METRICS, self.multi_metric_values):
+            values.extend(metric.evaluate(summary))
+
+    def print(self) -> None:
+        """Prints the running statistics."""
+        logging.info("Aggregated stats for %d runs processed so far.",
+                     self.num_runs)
+        for distribution in self.distributions:
+            logging.info("  %s: mean: %f, std: %f, median: ~%f.",
+                         distribution.metric.name, distribution.mean(),
+                         distribution.std(), distribution.median())
+
+    def plot(self) -> None:
+        """Plots the aggregated multi-metrics."""
+        for metric, values in zip(MULTI_METRICS, self.multi_metric_values):
+            plot_heatmap_and_scatter(values, metric)
+
+
+def process_runs_streaming(event_dfs: Iterable[pd.DataFrame]) -> None:
+    """Processes the simulation runs one by one with bounded memory.
+
+    The running statistics are printed periodically while the event logs are
+    still being read. Each event log is discarded once it has been processed.
+
+    Args:
+        event_dfs: Dataframes containing the events of each simulation run.
+    """
+    stats = RunningStats()
+    for event_df in event_dfs:
+        stats.fold(event_df)
+        if stats.num_runs % FLAGS.stats_report_interval == 0:
+            stats.print()
+
+    if stats.num_runs == 0:
+        logging.warning("No simulation runs to aggregate stats.")
+        return
+    if stats.num_runs % FLAGS.stats_report_interval != 0:
+        stats.print()
+    stats.plot()
+
+
+def _find_unfolded_event_logs(run_log_dir: str,
+                              folded_paths: set[Path]) -> list[Path]:
+    """Returns the event logs in the run log directory that have not been
+    folded in yet.
+
+    The run directories whose event log has already been folded in are not
+    walked again, so each poll only lists the directories of the runs that are
+    still running or pending.
+
+    Args:
+        run_log_dir: Run log directory containing subdirectories for the logs
+            of each run.
+        folded_paths: Paths to the event logs that have been folded in.
+    """
+    folded_dirs = {path.parent for path in folded_paths}
+    event_log_paths = []
+    for dirpath, dirnames, filenames in os.walk(run_log_dir):
+        dirpath = Path(dirpath)
+        dirnames[:] = [
+            dirname for dirname in dirnames
+            if dirpath / dirname not in folded_dirs
+        ]
+        for filename in fnmatch.filter(filenames,
+                                       f"{EVENT_LOG_FILE_PREFIX}_*.csv"):
+            path = dirpath / filename
+            if path not in folded_paths:
+                event_log_paths.append(path)
+    return sorted(event_log_paths)
+
+
+def _is_batch_finished(run_log_dir: str) -> bool:
+    """Returns whether the batch status file in the run log directory reports
+    that no runs are running or pending anymore.
+
+    Args:
+        run_log_dir: Run log directory containing subdirectories for the logs
+            of each run.
+    """
+    try:
+        status = json.loads((Path(run_log_dir) / BATCH_STATUS_FILE).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return status.get("num_running") == 0 and status.get("num_pending") == 0
+
+
+def watch_runs(run_log_dir: str, interval: float) -> None:
+    """Watches the run log directory and processes each simulation run as it
+    completes.
+
+    The event log of a run is only written once the run has completed, so an
+    event log is considered complete once its size and modification time have
+    not changed between two consecutive polls. An event log that cannot be
+    parsed yet, e.g., because it is still empty, is retried at the next poll.
+    Each event log is folded into the running statistics exactly once, and the
+    running statistics are printed whenever new runs have been folded in.
+    Watching stops once the batch status file reports that the batch has
+    finished or on a keyboard interrupt, after which the aggregated
+    multi-metrics are plotted.
+
+    Args:
+        run_log_dir: Run log directory containing subdirectories for the logs
+            of each run.
+        interval: Polling interval in seconds.
+    """
+    logging.info("Watching %s for completed runs. Press Ctrl+C to stop.",
+                 run_log_dir)
+    stats = RunningStats()
+    folded_paths: set[Path] = set()
+    # Size and modification time of each incomplete event log at the last poll.
+    pending_paths: dict[Path, tuple[int, int]] = {}
+    try:
+        while True:
+            num_runs = stats.num_runs
+            # The batch status is checked before looking for event logs, so
+            # the event logs of all runs have been written if the batch has
+            # finished.
+            is_batch_finished = _is_batch_finished(run_log_dir)
+            for path in _find_unfolded_event_logs(run_log_dir, folded_paths):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if (not is_batch_finished and
+                        pending_paths.get(path) != signature):
+                    pending_paths[path] = signature
+                    continue
+                try:
+                    event_df = utils.read_event_log(path)
+                except (ValueError, KeyError, AttributeError) as e:
+                    # Parser errors and empty files raise a ValueError, and a
+                    # partially written header may lack the event column.
+                    if is_batch_finished:
+                        logging.warning("Skipping unreadable event log %s: %s",
+                                        path, e)
+                        folded_paths.add(path)
+                    else:
+                        logging.warning(
+                            "Failed to read event log %s, retrying at the "
+                            "next poll: %s", path, e)
+                        pending_paths.pop(path, None)
+                    continue
+                stats.fold(event_df)
+                folded_paths.add(path)
+                pending_paths.pop(path, None)
+            if stats.num_runs > num_runs:
+                stats.print()
+            if is_batch_finished:
+                logging.info("The batch in %s has finished.", run_log_dir)
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        logging.info("Stopped watching %s.", run_log_dir)
+
+    if stats.num_runs == 0:
+        logging.warning("No simulation runs to aggregate stats.")
+        return
+    stats.plot()
 
 
 def plot_heatmap_and_scatter(
-    event_dfs: list[pd.DataFrame],
+    values: list[np.ndarray],
     metric: multi_metric.MultiMetric,
 ) -> None:
     """Plots a heatmap and a scatter plot of the multi-metric aggregated over
     all simulation runs.
 
     Args:
-        event_dfs: List of dataframes containing the events.
+        values: Aggregated metric values.
         metric: Multi-metric outputting 2D coordinates.
     """
-    aggregator = Aggregator(event_dfs, metric)
-    values = np.array(aggregator.values)
+    values = np.array(values)
     if values.size == 0:
         logging.warning("No metric values for metric: %s.", metric.name)
         return
@@ -127,11 +343,30 @@ def main(argv):
     run_log_dir = FLAGS.run_log_dir
     if not run_log_dir:
         run_log_dir = utils.find_latest_subdirectory(FLAGS.run_log_search_dir)
+    if FLAGS.watch:
+        watch_runs(run_log_dir, FLAGS.watch_interval)
+        return
+
     event_log_paths = utils.find_all_event_logs(run_log_dir)
-    event_dfs = [utils.read_event_log(path) for path in event_log_paths]
-    print_aggregated_stats(event_dfs)
+    num_workers = FLAGS.num_workers if FLAGS.num_workers > 0 else os.cpu_count()
+    if FLAGS.streaming_stats:
+        # The event log cache would keep all event logs in memory, so it is not
+        # used in streaming mode.
+        process_runs_streaming(
+            utils.iter_event_logs(event_log_paths, num_workers=num_workers))
+        return
+
+    cache = (utils.EventLogCache(run_log_dir)
+             if FLAGS.use_event_log_cache else None)
+    event_dfs = utils.read_event_logs(event_log_paths, cache, num_workers)
+    if cache is not None:
+        cache.save()
+    # Stack the events of all runs into a single table, so that the metrics
+    # are evaluated for all runs at once.
+    summary = BatchEventSummary(event_dfs)
+    print_aggregated_stats(summary, num_workers)
     for metric in MULTI_METRICS:
-        plot_heatmap_and_scatter(event_dfs, metric)
+        plot_heatmap_and_scatter(Aggregator(summary, metric).values, metric)
 
 
 if __name__ == "__main__":
@@ -141,5 +376,51 @@ if __name__ == "__main__":
     flags.DEFINE_string("run_log_search_dir",
                         unity_utils.get_persistent_data_directory(),
                         "Log directory in which to search for logs.")
+    flags.DEFINE_bool(
+        "use_event_log_cache", True,
+        "If true, cache the parsed event logs in the run log directory.")
+    flags.DEFINE_integer(
+        "num_workers",
+        0,
+        "Number of worker processes with which to read the event logs. "
+        "If 0, defaults to the number of CPUs.",
+        lower_bound=0,
+    )
+    flags.DEFINE_integer(
+        "num_bootstrap_resamples",
+        10000,
+        "Number of bootstrap resamples for the confidence intervals of the "
+        "mean. If 0, the confidence intervals are not computed.",
+        lower_bound=0,
+    )
+    flags.DEFINE_float(
+        "confidence_level",
+        0.95,
+        "Confidence level of the bootstrap confidence intervals.",
+        lower_bound=0,
+        upper_bound=1,
+    )
+    flags.DEFINE_bool(
+        "streaming_stats", False,
+        "If true, aggregate the stats run by run with bounded memory and "
+        "report the running stats while the event logs are being read. "
+        "The median is approximate in this mode.")
+    flags.DEFINE_bool(
+        "watch", False,
+        "If true, watch the run log directory while the batch is running and "
+        "fold in the stats of each run as it completes.")
+    flags.DEFINE_float(
+        "watch_interval",
+        10,
+        "Polling interval in seconds in watch mode.",
+        lower_bound=0.1,
+    )
+    flags.DEFINE_integer(
+        "stats_report_interval",
+        100,
+        "Number of runs after which to report the running stats in streaming "
+        "mode.",
+        lower_bound=1,
+    )
 
     app.run(main)
@@ -2,10 +2,12 @@
 telemetry file.
 """
 
+import base64
 import json
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import unity_utils
 import utils
@@ -17,6 +19,28 @@ FLAGS = flags.FLAGS
 # Helper columns in the JSON object.
 IS_INTERCEPTOR = "IsInterceptor"
 IS_THREAT = "IsThreat"
+INDEX = "Index"
+OFFSET = "Offset"
+LENGTH = "Length"
+
+# Trajectory columns embedded in the HTML file.
+_TRAJECTORY_COLUMNS = (
+    Column.TIME,
+    Column.POSITION_X,
+    Column.POSITION_Y,
+    Column.POSITION_Z,
+)
+
+# Encodings of the trajectories embedded in the HTML file.
+JSON_ENCODING = "json"
+FLOAT32_ENCODING = "float32"
+UINT16_ENCODING = "uint16"
+ENCODINGS = (JSON_ENCODING, FLOAT32_ENCODING, UINT16_ENCODING)
+
+# Maximum quantized value with the uint16 encoding. The largest value of the
+# data type is reserved for missing values.
+_MAX_QUANTIZED_VALUE = np.iinfo(np.uint16).max - 1
+_MISSING_QUANTIZED_VALUE = np.iinfo(np.uint16).max
 
 
 def _generate_agents_data(
@@ -47,24 +71,220 @@ def _generate_agents_data(
     return all_agents_data
 
 
+def _encode_buffer(values: np.ndarray, encoding: str) -> dict[str, Any]:
+    """Encodes the values into a base64-encoded binary buffer.
+
+    With the uint16 encoding, the finite values are quantized uniformly between
+    their minimum and maximum, and the missing values are mapped to a reserved
+    quantized value.
+
+    Args:
+        values: Values to encode.
+        encoding: Binary encoding of the values.
+
+    Returns:
+        A dictionary containing the base64-encoded buffer as well as the
+        minimum and the scale to decode the quantized values.
+    """
+    min_value = 0.0
+    scale = 1.0
+    if encoding == UINT16_ENCODING:
+        is_finite = np.isfinite(values)
+        finite_values = values[is_finite].astype(np.float64)
+        if len(finite_values) > 0:
+            min_value = float(finite_values.min())
+            value_range = float(finite_values.max()) - min_value
+            if value_range > 0:
+                scale = value_range / _MAX_QUANTIZED_VALUE
+        data = np.full(len(values), _MISSING_QUANTIZED_VALUE, dtype="<u2")
+        data[is_finite] = np.rint((finite_values - min_value) / scale)
+    else:
+        data = values.astype("<f4")
+    return {
+        "data": base64.b64encode(data.tobytes()).decode("ascii"),
+        "min": min_value,
+        "scale": scale,
+    }
+
+
+def _generate_encoded_agents_data(
+    telemetry_df: pd.DataFrame,
+    encoding: str,
+) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Generates a dictionary containing the properties of each agent and the
+    encoded trajectories of all agents.
+
+    The trajectories of all agents are concatenated into one binary buffer per
+    column, which is base64-encoded, and each agent references the range of
+    its samples within the buffers. With the uint16 encoding, each column is
+    additionally quantized uniformly between its minimum and maximum.
+
+    Args:
+        telemetry_df: Dataframe containing the telemetry data.
+        encoding: Binary encoding of the trajectories.
+
+    Returns:
+        A tuple containing a dictionary mapping from the agent ID to another
+        dictionary containing the agent properties and sample range, and a
+        dictionary mapping from each trajectory column to its encoded buffer.
+    """
+    agent_codes, agent_ids = pd.factorize(telemetry_df[Column.AGENT_ID],
+                                          sort=True)
+    # Group the samples by agent while preserving their order in time.
+    order = np.argsort(agent_codes, kind="stable")
+    lengths = np.bincount(agent_codes, minlength=len(agent_ids))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    agent_types = telemetry_df[Column.AGENT_TYPE].to_numpy()[order[offsets]]
+
+    all_agents_data: dict[str, dict[str, Any]] = {}
+    for index, (agent_id, agent_type, offset, length) in enumerate(
+            zip(agent_ids, agent_types, offsets, lengths)):
+        all_agents_data[agent_id] = {
+            IS_INTERCEPTOR: is_interceptor(agent_type),
+            IS_THREAT: is_threat(agent_type),
+            INDEX: index,
+            OFFSET: int(offset),
+            LENGTH: int(length),
+        }
+
+    buffers: dict[str, dict[str, Any]] = {}
+    for column in _TRAJECTORY_COLUMNS:
+        values = telemetry_df[column].to_numpy(dtype=np.float32)[order]
+        buffers[column] = _encode_buffer(values, encoding)
+    return all_agents_data, buffers
+
+
+def _generate_frame_table(telemetry_df: pd.DataFrame, fps: float) -> np.ndarray:
+    """Resamples the positions of all agents onto a common frame clock.
+
+    The frames are spaced by the inverse of the frame rate, starting one frame
+    after the first sample, and the position of each agent is linearly
+    interpolated in time between its samples. Before its first sample, the
+    position of an agent is missing, and after its last sample, the agent
+    remains at its last position.
+
+    Args:
+        telemetry_df: Dataframe containing the telemetry data.
+        fps: Target frame rate.
+
+    Returns:
+        An array of shape (number of frames, number of agents, 3) containing
+        the position of each agent in each frame, where the agents are sorted
+        by their ID and missing positions are NaN.
+    """
+    agent_codes, agent_ids = pd.factorize(telemetry_df[Column.AGENT_ID],
+                                          sort=True)
+    order = np.lexsort((telemetry_df[Column.TIME].to_numpy(), agent_codes))
+    times = telemetry_df[Column.TIME].to_numpy(dtype=np.float64)[order]
+    positions = telemetry_df[[
+        Column.POSITION_X,
+        Column.POSITION_Y,
+        Column.POSITION_Z,
+    ]].to_numpy(dtype=np.float64)[order]
+    agent_codes = agent_codes[order]
+
+    num_agents = len(agent_ids)
+    if num_agents == 0 or fps <= 0:
+        return np.empty((0, num_agents, 3), dtype=np.float32)
+    min_time = times.min()
+    max_time = times.max()
+    num_frames = int((max_time - min_time) * fps)
+    frame_times = min_time + np.arange(1, num_frames + 1) / fps
+
+    # Resample each agent separately into the frame table, so that only the
+    # frame table itself scales with both the number of frames and the number
+    # of agents.
+    frame_positions = np.full((num_frames, num_agents, 3),
+                              np.nan,
+                              dtype=np.float32)
+    lengths = np.bincount(agent_codes, minlength=num_agents)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    for agent_code, (start, end) in enumerate(zip(starts, ends)):
+        agent_times = times[start:end]
+        agent_positions = positions[start:end]
+
+        # Find the samples before and after each frame after the first sample.
+        first_frame = np.searchsorted(frame_times, agent_times[0], side="left")
+        agent_frame_times = frame_times[first_frame:]
+        next_indices = np.searchsorted(agent_times,
+                                       agent_frame_times,
+                                       side="right")
+        has_ended = next_indices >= len(agent_times)
+        next_indices = np.minimum(next_indices, len(agent_times) - 1)
+        previous_indices = np.maximum(next_indices - 1, 0)
+
+        # Interpolate the positions linearly in time.
+        durations = agent_times[next_indices] - agent_times[previous_indices]
+        fractions = np.divide(agent_frame_times - agent_times[previous_indices],
+                              durations,
+                              out=np.zeros_like(durations),
+                              where=durations > 0)
+        fractions = np.where(has_ended, 1.0, np.clip(fractions, 0.0, 1.0))
+        previous_positions = agent_positions[previous_indices]
+        frame_positions[first_frame:, agent_code] = (
+            previous_positions + fractions[:, np.newaxis] *
+            (agent_positions[next_indices] - previous_positions))
+    return frame_positions
+
+
 def generate_animation(
     telemetry_df: pd.DataFrame,
     telemetry_file_path: Path,
     output: str,
     fps: float,
+    encoding: str = FLOAT32_ENCODING,
+    frame_table: bool = False,
 ) -> None:
     """Generates an HTML file containing an interactive 3D animation of the
     telemetry data.
 
+    With a binary encoding, the trajectories are embedded as base64-encoded
+    typed arrays, which are decoded in the browser. This makes the HTML file
+    several times smaller and faster to both generate and load than embedding
+    the trajectories as JSON lists.
+
+    With a frame table, the positions of all agents are resampled at the
+    target frame rate in advance, so the browser only indexes into the frame
+    table in each frame and renders the markers of all agents in a single
+    trace. This keeps the frame time low with many agents at the cost of a
+    larger HTML file.
+
     Args:
         telemetry_df: Dataframe containing the telemetry data.
         telemetry_file_path: Telemetry file path.
         output: Output HTML file.
         fps: Target frame rate.
+        encoding: Encoding of the trajectories, i.e., json, float32, or
+            uint16.
+        frame_table: If true, embed a frame table with the positions of all
+            agents in each frame. Requires a binary encoding.
+
+    Raises:
+        ValueError: If a frame table is requested with the JSON encoding.
     """
+    if frame_table and encoding == JSON_ENCODING:
+        raise ValueError("The frame table requires a binary encoding.")
     min_time = telemetry_df[Column.TIME].min()
     max_time = telemetry_df[Column.TIME].max()
-    all_agents_data = _generate_agents_data(telemetry_df)
+    if encoding == JSON_ENCODING:
+        all_agents_data = _generate_agents_data(telemetry_df)
+        buffers = {}
+    else:
+        all_agents_data, buffers = _generate_encoded_agents_data(
+            telemetry_df, encoding)
+    num_frames = 0
+    frame_buffers = {}
+    if frame_table:
+        frame_positions = _generate_frame_table(telemetry_df, fps)
+        num_frames = len(frame_positions)
+        frame_buffers = {
+            column: _encode_buffer(frame_positions[..., axis].ravel(), encoding)
+            for axis, column in enumerate((Column.POSITION_X, Column.POSITION_Y,
+                                           Column.POSITION_Z))
+        }
+        logging.info("Resampled %d agents onto %d frames.",
+                     frame_positions.shape[1], num_frames)
     html = f"""
 <!DOCTYPE html>
 <html>
@@ -78,6 +298,12 @@ def generate_animation(
     <div id="plot" style="width: 100%; height: 95vh;"></div>
     <script>
 const agents = {json.dumps(all_agents_data, separators=(",", ":"))};
+const encoding = "{encoding}";
+const buffers = {json.dumps(buffers, separators=(",", ":"))};
+const frameBuffers = {json.dumps(frame_buffers, separators=(",", ":"))};
+const useFrameTable = {json.dumps(frame_table)};
+const numFrames = {num_frames};
+const numAgents = Object.keys(agents).length;
 const minTime = {min_time};
 const maxTime = {max_time};
 const fps = {fps};
@@ -88,6 +314,38 @@ const positionXColumn = "{Column.POSITION_X}";
 const positionYColumn = "{Column.POSITION_Y}";
 const positionZColumn = "{Column.POSITION_Z}";
 
+function decodeBuffer(buffer) {{
+    const binary = atob(buffer.data);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; ++i) {{
+        bytes[i] = binary.charCodeAt(i);
+    }}
+    if (encoding === "{UINT16_ENCODING}") {{
+        const quantized = new Uint16Array(bytes.buffer);
+        const values = new Float32Array(quantized.length);
+        for (let i = 0; i < quantized.length; ++i) {{
+            values[i] = quantized[i] === {_MISSING_QUANTIZED_VALUE} ? NaN : buffer.min + quantized[i] * buffer.scale;
+        }}
+        return values;
+    }}
+    return new Float32Array(bytes.buffer);
+}}
+
+// Point each agent's trajectory columns to its samples in the decoded buffers.
+for (const column in buffers) {{
+    const values = decodeBuffer(buffers[column]);
+    for (const agent in agents) {{
+        const agentData = agents[agent];
+        agentData[column] = values.subarray(agentData.{OFFSET}, agentData.{OFFSET} + agentData.{LENGTH});
+    }}
+}}
+
+// Decode the frame table, which contains the positions of all agents in each frame.
+const frameTable = {{}};
+for (const column in frameBuffers) {{
+    frameTable[column] = decodeBuffer(frameBuffers[column]);
+}}
+
 function firstGreaterThan(arr, N) {{
   let left = 0;
   let right = arr.length;
@@ -155,7 +413,67 @@ function symbol(data) {{
 let data = [];
 let agentToTrajectoryIndex = {{}};
 let agentToMarkerIndex = {{}};
-for (const agent in agents) {{
+let trails = [];
+let markerIndex = 0;
+const trailOffsets = new Int32Array(numAgents);
+if (useFrameTable) {{
+    // Combine the trajectories of all agents with the same color into one trace.
+    const colorToTrail = {{}};
+    for (const agent in agents) {{
+        const agentData = agents[agent];
+        const agentColor = color(agentData);
+        if (!(agentColor in colorToTrail)) {{
+            colorToTrail[agentColor] = {{ agents: [], length: 0 }};
+        }}
+        const trail = colorToTrail[agentColor];
+        trail.agents.push(agent);
+        // Reserve space for the samples, the current position, and a gap to the next agent.
+        trailOffsets[agentData.{INDEX}] = trail.length;
+        trail.length += agentData[timeColumn].length + 2;
+    }}
+    for (const agentColor in colorToTrail) {{
+        const trail = colorToTrail[agentColor];
+        trail.index = data.length;
+        // Unused space is NaN, so it appears as a gap in the trajectories.
+        trail.x = new Float32Array(trail.length).fill(NaN);
+        trail.y = new Float32Array(trail.length).fill(NaN);
+        trail.z = new Float32Array(trail.length).fill(NaN);
+        trails.push(trail);
+        data.push({{
+            type: "scatter3d",
+            mode: "lines",
+            x: [],
+            y: [],
+            z: [],
+            line: {{
+                color: agentColor,
+                width: 2,
+            }},
+            hoverinfo: "skip",
+            showlegend: false,
+        }});
+    }}
+
+    // Render the markers of all agents in a single trace in the order of the frame table.
+    const sortedAgents = Object.keys(agents).sort((a, b) => agents[a].{INDEX} - agents[b].{INDEX});
+    markerIndex = data.length;
+    data.push({{
+        type: "scatter3d",
+        mode: "markers",
+        x: [],
+        y: [],
+        z: [],
+        text: sortedAgents,
+        hoverinfo: "text",
+        marker: {{
+            color: sortedAgents.map(agent => color(agents[agent])),
+            size: 4,
+            symbol: sortedAgents.map(agent => symbol(agents[agent])),
+        }},
+        showlegend: false,
+    }});
+}}
+for (const agent in useFrameTable ? {{}} : agents) {{
     const agentData = agents[agent];
 
     // Agent trajectory.
@@ -286,6 +604,94 @@ function animate() {{
     setTimeout(() => requestAnimationFrame(animate), 1000.0 / fps);
 }}
 
+let frame = -1;
+const trajectoryLengths = new Int32Array(numAgents);
+function animateFrames() {{
+    ++frame;
+    if (frame >= numFrames) {{
+        setTimeout(() => resetFrames(), restartDelayMs);
+        return;
+    }}
+    const t = minTime + (frame + 1) / fps;
+
+    // Swap the y and z coordinates for plotting to conform to Unity's conventions.
+    const frameStart = frame * numAgents;
+    const markerX = frameTable[positionXColumn].subarray(frameStart, frameStart + numAgents);
+    const markerY = frameTable[positionZColumn].subarray(frameStart, frameStart + numAgents);
+    const markerZ = frameTable[positionYColumn].subarray(frameStart, frameStart + numAgents);
+
+    const dataUpdate = {{ x: [], y: [], z: [] }};
+    const traceIndices = [];
+    for (const trail of trails) {{
+        // Only the part of the trail up to the current position of its last started agent is drawn.
+        let drawLength = 0;
+        for (const agent of trail.agents) {{
+            const agentData = agents[agent];
+            const times = agentData[timeColumn];
+            const index = agentData.{INDEX};
+
+            // Advance past the samples up to the current time.
+            const previousTrajectoryLength = trajectoryLengths[index];
+            let trajectoryLength = previousTrajectoryLength;
+            while (trajectoryLength < times.length && times[trajectoryLength] <= t) {{
+                ++trajectoryLength;
+            }}
+            trajectoryLengths[index] = trajectoryLength;
+            if (trajectoryLength === 0) {{
+                continue;
+            }}
+
+            // Only copy the samples passed since the last frame, which overwrite the previous current position.
+            const offset = trailOffsets[index];
+            if (trajectoryLength > previousTrajectoryLength) {{
+                const start = offset + previousTrajectoryLength;
+                trail.x.set(agentData[positionXColumn].subarray(previousTrajectoryLength, trajectoryLength), start);
+                trail.y.set(agentData[positionZColumn].subarray(previousTrajectoryLength, trajectoryLength), start);
+                trail.z.set(agentData[positionYColumn].subarray(previousTrajectoryLength, trajectoryLength), start);
+            }}
+            const end = offset + trajectoryLength;
+            trail.x[end] = markerX[index];
+            trail.y[end] = markerY[index];
+            trail.z[end] = markerZ[index];
+            drawLength = end + 1;
+        }}
+        dataUpdate.x.push(trail.x.subarray(0, drawLength));
+        dataUpdate.y.push(trail.y.subarray(0, drawLength));
+        dataUpdate.z.push(trail.z.subarray(0, drawLength));
+        traceIndices.push(trail.index);
+    }}
+    dataUpdate.x.push(markerX);
+    dataUpdate.y.push(markerY);
+    dataUpdate.z.push(markerZ);
+    traceIndices.push(markerIndex);
+    const layoutUpdate = {{
+        "title.text": `Time: ${{t.toFixed(2)}}`,
+    }};
+
+    Plotly.update("plot", dataUpdate, layoutUpdate, traceIndices);
+    setTimeout(() => requestAnimationFrame(animateFrames), 1000.0 / fps);
+}}
+
+function resetFrames() {{
+    frame = -1;
+    trajectoryLengths.fill(0);
+    for (const trail of trails) {{
+        trail.x.fill(NaN);
+        trail.y.fill(NaN);
+        trail.z.fill(NaN);
+    }}
+    const dataUpdate = {{
+        x: Array.from({{ length: data.length }}, () => []),
+        y: Array.from({{ length: data.length }}, () => []),
+        z: Array.from({{ length: data.length }}, () => []),
+    }};
+    const layoutUpdate = {{
+        "title.text": "Time: 0.00",
+    }};
+    Plotly.update("plot", dataUpdate, layoutUpdate);
+    requestAnimationFrame(animateFrames);
+}}
+
 function reset() {{
     t = minTime;
     const dataUpdate = {{
@@ -300,7 +706,7 @@ function reset() {{
     requestAnimationFrame(animate);
 }}
 
-requestAnimationFrame(animate);
+requestAnimationFrame(useFrameTable ? animateFrames : animate);
     </script>
 </body>
 </html>
@@ -321,24 +727,89 @@ def main(argv):
             FLAGS.log_search_dir)
     if not telemetry_file_path:
         raise ValueError("No telemetry file was provided.")
+    if FLAGS.event_log:
+        event_log_path = Path(FLAGS.event_log)
+    elif not FLAGS.telemetry_file:
+        event_log_path = utils.find_latest_event_log(FLAGS.log_search_dir)
+    else:
+        event_log_path = None
 
-    telemetry_df = utils.read_telemetry_file(telemetry_file_path)
+    telemetry_df = utils.read_telemetry_file(
+        telemetry_file_path,
+        start_time=FLAGS.start_time,
+        end_time=FLAGS.end_time,
+        agent_types=FLAGS.agent_types,
+        agent_ids=FLAGS.agent_ids,
+    )
+    if telemetry_df.empty:
+        raise ValueError("No telemetry records match the filters.")
+    # Retain the samples around the events when simplifying the trajectories.
+    event_df = (utils.read_event_log(event_log_path)
+                if event_log_path is not None else None)
+    num_samples = len(telemetry_df)
+    telemetry_df = utils.simplify_trajectories(telemetry_df,
+                                               FLAGS.simplify_tolerance,
+                                               event_df)
+    logging.info("Simplified the trajectories from %d to %d samples.",
+                 num_samples, len(telemetry_df))
     generate_animation(
         telemetry_df,
         telemetry_file_path,
         FLAGS.output,
         FLAGS.fps,
+        FLAGS.encoding,
+        FLAGS.frame_table,
     )
 
 
 if __name__ == "__main__":
     flags.DEFINE_string("telemetry_file", None,
-                        "Path to the telemetry CSV file.")
+                        "Path to the telemetry binary or CSV file.")
+    flags.DEFINE_string(
+        "event_log", None,
+        "Path to the event CSV log, whose samples are retained when "
+        "simplifying the trajectories. If neither the telemetry file nor the "
+        "event log is given, the latest event log is used.")
     flags.DEFINE_string("log_search_dir",
                         unity_utils.get_persistent_data_directory(),
                         "Log directory in which to search for logs.")
     flags.DEFINE_string("output", None, "Output HTML file.")
+    flags.DEFINE_float(
+        "start_time", None,
+        "If given, only replay the telemetry from this simulation time. With "
+        "any of the time or agent filters, the telemetry is read from its "
+        "memory-mapped layout, whose generation on the first filtered read "
+        "parses the whole telemetry file.")
+    flags.DEFINE_float(
+        "end_time", None,
+        "If given, only replay the telemetry up to this simulation time.")
+    flags.DEFINE_list(
+        "agent_types", None,
+        "If given, only replay the agents of these comma-separated agent "
+        "types, e.g., MissileInterceptor,FixedWingThreat.")
+    flags.DEFINE_list(
+        "agent_ids", None,
+        "If given, only replay the agents with these comma-separated agent "
+        "IDs.")
     flags.DEFINE_float("fps", 30, "Target frame rate.", lower_bound=0.0)
+    flags.DEFINE_float(
+        "simplify_tolerance",
+        0.0,
+        "Maximum position error in meters when simplifying the trajectories "
+        "before embedding them. If 0, all telemetry samples are embedded.",
+        lower_bound=0.0,
+    )
+    flags.DEFINE_enum(
+        "encoding", FLOAT32_ENCODING, ENCODINGS,
+        "Encoding of the trajectories embedded in the HTML file. float32 "
+        "embeds base64-encoded typed arrays, uint16 additionally quantizes "
+        "them, and json embeds JSON lists.")
+    flags.DEFINE_bool(
+        "frame_table", False,
+        "If true, resample the positions of all agents at the target frame "
+        "rate and embed the frame table in the HTML file, which keeps the "
+        "animation smooth with many agents at the cost of a larger file. "
+        "Requires a binary encoding.")
     flags.mark_flag_as_required("output")
 
     app.run(main)
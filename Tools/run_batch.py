@@ -1,17 +1,32 @@
 """Launches a batch of deterministic Unity simulation runs in parallel."""
 
+import collections
+import contextlib
+import csv
+import dataclasses
 import datetime
+import fnmatch
+import json
 import os
 import platform
+import queue
+import shutil
+import signal
+import socket
 import subprocess
+import sys
+import threading
 import time
-from dataclasses import dataclass
 from pathlib import Path
 
 import google.protobuf.text_format
 import unity_utils
 from absl import app, flags, logging
-from pb import run_config_pb2
+from constants import (BATCH_MANIFEST_CSV_FILE, BATCH_MANIFEST_FILE,
+                       BATCH_STATUS_FILE, EVENT_LOG_FILE_PREFIX,
+                       TELEMETRY_BINARY_FILE_EXTENSION, TELEMETRY_FILE_PREFIX,
+                       RunStatus)
+from pb import run_config_pb2, simulator_config_pb2
 
 # Path to the repository root.
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -19,10 +34,44 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 # Directory with the run configurations.
 RUN_CONFIG_DIR = REPO_ROOT / "Assets/StreamingAssets/Configs/Runs"
 
+# Simulator configuration with which the Unity executable is built.
+SIMULATOR_CONFIG_FILE = REPO_ROOT / "Assets/StreamingAssets/simulator.pbtxt"
+
+# Minimum interval in seconds between saves of the batch manifest while runs
+# are being recorded. Since each save rewrites the whole manifest, saving after
+# every run would take quadratic time in the number of runs.
+BATCH_MANIFEST_SAVE_INTERVAL = 10.0
+
+# Interval in seconds between resource samples of the adaptive parallelism.
+ADAPTIVE_PARALLELISM_SAMPLE_INTERVAL = 5.0
+
+# Fraction of the total memory to keep available when launching workers.
+ADAPTIVE_PARALLELISM_MEMORY_RESERVE = 0.1
+
+# Minimum number of idle CPU cores to launch another worker. This is slightly
+# less than one core to tolerate the CPU usage of the launcher itself.
+ADAPTIVE_PARALLELISM_MIN_IDLE_CORES = 0.8
+
+# Interval in seconds between checks of the run watchdog.
+RUN_WATCHDOG_CHECK_INTERVAL = 5.0
+
+# Interval in seconds at which a persistent worker is checked for having
+# exited while waiting for it to connect to its job server.
+PERSISTENT_WORKER_CONNECT_INTERVAL = 1.0
+
+# Time in seconds to wait for the persistent workers to quit once the batch
+# has finished before terminating them.
+PERSISTENT_WORKER_SHUTDOWN_TIMEOUT = 30.0
+
+# Maximum time in seconds that the scheduler blocks on the queue of finished
+# runs at once. A blocking queue get cannot be interrupted by Ctrl+C on
+# Windows, so the scheduler blocks in slices of at most this duration.
+FINISHED_RUNS_POLL_INTERVAL = 1.0
+
 FLAGS = flags.FLAGS
 
 
-@dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True)
 class RunDescriptor:
     """Description of a deterministic simulation run.
 
@@ -39,6 +88,718 @@ class RunDescriptor:
     output_dir: Path
 
 
+@dataclasses.dataclass(frozen=True)
+class WorkerUsage:
+    """Resource usage of a worker process.
+
+    Attributes:
+        wall_time: Wall-clock time in seconds.
+        user_time: User CPU time in seconds or None if unavailable.
+        system_time: System CPU time in seconds or None if unavailable.
+        peak_rss: Peak resident set size in bytes or None if unavailable.
+    """
+
+    wall_time: float
+    user_time: float | None = None
+    system_time: float | None = None
+    peak_rss: int | None = None
+
+
+@dataclasses.dataclass
+class RunRecord:
+    """Record of a simulation run in the batch manifest.
+
+    Attributes:
+        run_index: Run index.
+        seed: Seed.
+        output_dir: Output directory relative to the batch output directory.
+        status: Run status.
+        exit_code: Exit code of the worker process.
+        simulation_config_file: Simulation configuration file.
+        wall_time: Wall-clock time of the worker process in seconds.
+        user_time: User CPU time of the worker process in seconds.
+        system_time: System CPU time of the worker process in seconds.
+        peak_rss: Peak resident set size of the worker process in bytes.
+        output_bytes: Total size of the files in the output directory in
+            bytes.
+        files: Paths of the files in the output directory relative to the
+            output directory.
+    """
+
+    run_index: int
+    seed: int
+    output_dir: str
+    status: RunStatus
+    exit_code: int | None
+    simulation_config_file: str | None = None
+    wall_time: float | None = None
+    user_time: float | None = None
+    system_time: float | None = None
+    peak_rss: int | None = None
+    output_bytes: int | None = None
+    files: list[str] | None = None
+
+
+class BatchManifest:
+    """The batch manifest records the status of each run in a batch.
+
+    The manifest is stored as a JSON file in the batch output directory and is
+    rewritten atomically at most every BATCH_MANIFEST_SAVE_INTERVAL seconds
+    while runs are being recorded, so it remains consistent even if the
+    launcher itself is interrupted. Runs recorded after the last save are
+    executed again when the batch is resumed. Since the manifest also lists
+    the files produced by each run, the analysis tools can find the logs of a
+    batch without walking the batch output directory. A CSV copy of the
+    manifest with one row per run is written next to it for analysis.
+
+    Attributes:
+        path: Path to the manifest file.
+        csv_path: Path to the manifest file in CSV format.
+        shard_index: Index of the shard of the batch.
+        num_shards: Number of shards into which the batch is split.
+        runs: Map from the run index to the run record.
+    """
+
+    def __init__(self, batch_output_dir: Path):
+        self._batch_output_dir = batch_output_dir
+        self.path = batch_output_dir / BATCH_MANIFEST_FILE
+        self.csv_path = batch_output_dir / BATCH_MANIFEST_CSV_FILE
+        self.shard_index = 0
+        self.num_shards = 1
+        self.runs: dict[int, RunRecord] = {}
+        self._next_save_time = 0.0
+        if self.path.exists():
+            manifest = json.loads(self.path.read_text())
+            self.shard_index = manifest.get("shard_index", 0)
+            self.num_shards = manifest.get("num_shards", 1)
+            for run in manifest["runs"]:
+                record = RunRecord(**run)
+                record.status = RunStatus(record.status)
+                self.runs[record.run_index] = record
+
+    def record(
+        self,
+        descriptor: RunDescriptor,
+        status: RunStatus,
+        exit_code: int | None,
+        usage: WorkerUsage | None = None,
+        output_files: list[Path] | None = None,
+    ) -> None:
+        """Records the outcome of a run and saves the manifest if the save
+        interval has elapsed since the last save.
+
+        Args:
+            descriptor: Run descriptor.
+            status: Run status.
+            exit_code: Exit code of the worker process.
+            usage: Resource usage of the worker process.
+            output_files: Files in the output directory.
+        """
+        self.runs[descriptor.run_index] = RunRecord(
+            run_index=descriptor.run_index,
+            seed=descriptor.seed,
+            output_dir=descriptor.output_dir.relative_to(
+                self._batch_output_dir).as_posix(),
+            status=status,
+            exit_code=exit_code,
+            simulation_config_file=descriptor.simulation_config_file,
+            output_bytes=(sum(path.stat().st_size for path in output_files)
+                          if output_files is not None else None),
+            files=([
+                path.relative_to(descriptor.output_dir).as_posix()
+                for path in output_files
+            ] if output_files is not None else None),
+            **(dataclasses.asdict(usage) if usage is not None else {}),
+        )
+        if time.monotonic() >= self._next_save_time:
+            self.save()
+
+    def save(self) -> None:
+        """Saves the manifest atomically."""
+        self._next_save_time = time.monotonic() + BATCH_MANIFEST_SAVE_INTERVAL
+        manifest = {
+            "shard_index":
+                self.shard_index,
+            "num_shards":
+                self.num_shards,
+            "runs": [
+                dataclasses.asdict(self.runs[run_index])
+                for run_index in sorted(self.runs)
+            ],
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        tmp_path.replace(self.path)
+
+        tmp_csv_path = self.csv_path.with_name(f"{self.csv_path.name}.tmp")
+        with open(tmp_csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(
+                f,
+                fieldnames=[
+                    field.name for field in dataclasses.fields(RunRecord)
+                ],
+            )
+            writer.writeheader()
+            for run in manifest["runs"]:
+                # Join the file paths, so each run remains a single row.
+                files = run["files"]
+                writer.writerow({
+                    **run,
+                    "files":
+                        ";".join(files) if files is not None else None,
+                })
+        tmp_csv_path.replace(self.csv_path)
+
+
+class BatchProgress:
+    """Tracks the progress of a batch and reports it periodically.
+
+    The progress is logged and written to a status file in the batch output
+    directory, so that other tools can monitor a running batch. The estimated
+    time remaining assumes that the pending runs take the mean duration of the
+    finished runs and are executed with the current concurrency.
+
+    Attributes:
+        path: Path to the status file.
+        num_runs: Number of runs to execute.
+        num_completed: Number of runs that have completed successfully.
+        num_failed: Number of runs that have failed.
+        num_retried: Number of times that a run has been retried.
+    """
+
+    def __init__(self,
+                 batch_output_dir: Path,
+                 num_runs: int,
+                 report_interval: float = 0):
+        self.path = batch_output_dir / BATCH_STATUS_FILE
+        self.num_runs = num_runs
+        self.num_completed = 0
+        self.num_failed = 0
+        self.num_retried = 0
+        self._report_interval = report_interval
+        self._start_time = time.monotonic()
+        self._next_report_time = self._start_time + report_interval
+        # Map from the run index to the run descriptor and the start time of
+        # each running run.
+        self._running_runs: dict[int, tuple[RunDescriptor, float]] = {}
+        self._total_duration = 0.0
+
+    @property
+    def num_finished(self) -> int:
+        return self.num_completed + self.num_failed
+
+    @property
+    def num_pending(self) -> int:
+        return self.num_runs - self.num_finished - len(self._running_runs)
+
+    def start_run(self, descriptor: RunDescriptor) -> None:
+        """Marks a run as running."""
+        self._running_runs[descriptor.run_index] = (descriptor,
+                                                    time.monotonic())
+
+    def finish_run(self, run_index: int, wall_time: float,
+                   failed: bool) -> None:
+        """Marks a run as finished and saves the status file.
+
+        Args:
+            run_index: Run index.
+            wall_time: Wall-clock time of the run in seconds.
+            failed: If true, the run has failed.
+        """
+        del self._running_runs[run_index]
+        self._total_duration += wall_time
+        if failed:
+            self.num_failed += 1
+        else:
+            self.num_completed += 1
+        self.save()
+
+    def retry_run(self, run_index: int) -> None:
+        """Marks a run as pending again to be retried."""
+        del self._running_runs[run_index]
+        self.num_retried += 1
+
+    def get_time_until_next_report(self) -> float | None:
+        """Returns the time in seconds until the next report or None if the
+        progress is not reported periodically."""
+        if self._report_interval <= 0:
+            return None
+        return max(self._next_report_time - time.monotonic(), 0)
+
+    def get_throughput(self) -> float:
+        """Returns the number of finished runs per minute."""
+        elapsed_time = time.monotonic() - self._start_time
+        return self.num_finished / elapsed_time * 60 if elapsed_time > 0 else 0
+
+    def get_time_remaining(self) -> float | None:
+        """Returns the estimated time remaining in seconds or None if no run
+        has finished yet."""
+        if self.num_finished == 0:
+            return None
+        if not self._running_runs:
+            return 0.0
+        mean_duration = self._total_duration / self.num_finished
+        now = time.monotonic()
+        remaining_work = self.num_pending * mean_duration + sum(
+            max(mean_duration - (now - start_time), 0)
+            for _, start_time in self._running_runs.values())
+        return remaining_work / len(self._running_runs)
+
+    def report(self) -> None:
+        """Logs the progress and saves the status file if the report interval
+        has elapsed."""
+        time_until_next_report = self.get_time_until_next_report()
+        if time_until_next_report is None or time_until_next_report > 0:
+            return
+        self._next_report_time = time.monotonic() + self._report_interval
+
+        time_remaining = self.get_time_remaining()
+        logging.info(
+            "Progress: %d/%d runs finished (%d failed), %d running, "
+            "%d pending, %.1f runs/min, ETA %s.",
+            self.num_finished, self.num_runs, self.num_failed,
+            len(self._running_runs), self.num_pending, self.get_throughput(),
+            datetime.timedelta(seconds=round(time_remaining))
+            if time_remaining is not None else "unknown")
+        for running_run in self._get_running_runs():
+            logging.info("Run %d with seed %d has been running for %.0f s.",
+                         running_run["run_index"], running_run["seed"],
+                         running_run["elapsed_time"])
+        self.save()
+
+    def save(self) -> None:
+        """Saves the status file atomically."""
+        status = {
+            "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "elapsed_time": time.monotonic() - self._start_time,
+            "num_runs": self.num_runs,
+            "num_completed": self.num_completed,
+            "num_failed": self.num_failed,
+            "num_retried": self.num_retried,
+            "num_running": len(self._running_runs),
+            "num_pending": self.num_pending,
+            "runs_per_minute": self.get_throughput(),
+            "time_remaining": self.get_time_remaining(),
+            "running_runs": self._get_running_runs(),
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(status, indent=2))
+        tmp_path.replace(self.path)
+
+    def _get_running_runs(self) -> list[dict[str, int | float]]:
+        """Returns the run index, seed, and elapsed time of each running run
+        in the order of the run index."""
+        now = time.monotonic()
+        running_runs = []
+        for run_index in sorted(self._running_runs):
+            descriptor, start_time = self._running_runs[run_index]
+            running_runs.append({
+                "run_index": run_index,
+                "seed": descriptor.seed,
+                "elapsed_time": now - start_time,
+            })
+        return running_runs
+
+
+class RunWatchdog:
+    """The run watchdog detects hung runs.
+
+    A run is hung if it has exceeded the run timeout or if its binary telemetry
+    file has not grown for the stall timeout. Since the binary telemetry file
+    is written incrementally while the simulation is running, a worker that has
+    deadlocked stops growing it. The stall timeout therefore also needs to
+    cover the startup of the worker until the telemetry file is first written.
+    If telemetry logging is disabled, the stall timeout must be 0 since every
+    run would appear to have stalled.
+
+    Attributes:
+        run_timeout: Maximum wall-clock time of a run in seconds or 0 if the
+            run time is unlimited.
+        stall_timeout: Maximum time in seconds without any telemetry growth or
+            0 if stalls are not detected.
+    """
+
+    def __init__(self, run_timeout: float, stall_timeout: float):
+        self.run_timeout = run_timeout
+        self.stall_timeout = stall_timeout
+        self._next_check_time = time.monotonic()
+        # Map from the run index to the run descriptor, the start time, the
+        # telemetry size, and the last time at which the telemetry has grown.
+        self._runs: dict[int, tuple[RunDescriptor, float, int, float]] = {}
+
+    def start_run(self, descriptor: RunDescriptor) -> None:
+        """Starts watching a run."""
+        start_time = time.monotonic()
+        self._runs[descriptor.run_index] = (descriptor, start_time, 0,
+                                            start_time)
+
+    def stop_run(self, run_index: int) -> None:
+        """Stops watching a run."""
+        self._runs.pop(run_index, None)
+
+    def get_time_until_next_check(self) -> float:
+        """Returns the time in seconds until the next check."""
+        return max(self._next_check_time - time.monotonic(), 0)
+
+    def find_hung_runs(self) -> list[tuple[int, str]]:
+        """Checks the watched runs if the check interval has elapsed.
+
+        Returns:
+            The run index and the reason of each hung run.
+        """
+        now = time.monotonic()
+        if now < self._next_check_time:
+            return []
+        self._next_check_time = now + RUN_WATCHDOG_CHECK_INTERVAL
+
+        hung_runs = []
+        for run_index, (descriptor, start_time, telemetry_bytes,
+                        growth_time) in self._runs.items():
+            if self.run_timeout > 0 and now - start_time > self.run_timeout:
+                hung_runs.append(
+                    (run_index, f"Run {run_index} exceeded the run timeout "
+                     f"of {self.run_timeout:g} s."))
+                continue
+            if self.stall_timeout <= 0:
+                continue
+            current_telemetry_bytes = _compute_telemetry_bytes(
+                descriptor.output_dir)
+            if current_telemetry_bytes > telemetry_bytes:
+                self._runs[run_index] = (descriptor, start_time,
+                                         current_telemetry_bytes, now)
+            elif now - growth_time > self.stall_timeout:
+                hung_runs.append(
+                    (run_index, f"Run {run_index} has not written any "
+                     f"telemetry for {now - growth_time:.0f} s."))
+        return hung_runs
+
+
+class AdaptiveParallelism:
+    """Adapts the number of concurrent workers to the available resources.
+
+    The CPU load, the available memory, and the resident set size (RSS) of the
+    running workers are sampled from /proc at a fixed interval. The
+    concurrency limit starts at a single worker and is raised by one worker per
+    sample while about one CPU core is idle and the available memory can
+    accommodate another worker of the size of the largest running worker.
+    Otherwise, the limit is held at the number of running workers, so no
+    further workers are launched until the box has headroom again. The
+    concurrency limit never exceeds the maximum parallelism.
+
+    Adaptive parallelism is only supported on Linux.
+
+    Attributes:
+        max_parallel: Maximum number of concurrent workers.
+        limit: Current maximum number of concurrent workers.
+    """
+
+    def __init__(self, max_parallel: int):
+        self.max_parallel = max_parallel
+        self.limit = 1
+        self._cpu_times = _read_cpu_times()
+        self._next_sample_time = (time.monotonic() +
+                                  ADAPTIVE_PARALLELISM_SAMPLE_INTERVAL)
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Returns whether the resources can be sampled on this platform."""
+        return Path("/proc/stat").exists() and Path("/proc/meminfo").exists()
+
+    def get_time_until_next_sample(self) -> float:
+        """Returns the time in seconds until the next resource sample."""
+        return max(self._next_sample_time - time.monotonic(), 0)
+
+    def update(self, worker_pids: list[int]) -> None:
+        """Samples the resources and updates the concurrency limit if the
+        sample interval has elapsed.
+
+        Args:
+            worker_pids: Process IDs of the running workers.
+        """
+        if time.monotonic() < self._next_sample_time:
+            return
+        self._next_sample_time = (time.monotonic() +
+                                  ADAPTIVE_PARALLELISM_SAMPLE_INTERVAL)
+
+        cpu_times = _read_cpu_times()
+        idle_time = cpu_times[0] - self._cpu_times[0]
+        total_time = cpu_times[1] - self._cpu_times[1]
+        self._cpu_times = cpu_times
+        idle_fraction = idle_time / total_time if total_time > 0 else 1
+        num_idle_cores = idle_fraction * (os.cpu_count() or 1)
+
+        available_memory, total_memory = _read_memory()
+        worker_rss = max((_read_process_rss(pid) for pid in worker_pids),
+                         default=0)
+        has_memory_headroom = (available_memory - worker_rss
+                               > ADAPTIVE_PARALLELISM_MEMORY_RESERVE *
+                               total_memory)
+
+        num_workers = len(worker_pids)
+        if (not has_memory_headroom or
+                num_idle_cores < ADAPTIVE_PARALLELISM_MIN_IDLE_CORES):
+            limit = max(min(self.limit, num_workers), 1)
+        elif num_workers >= self.limit:
+            limit = min(self.limit + 1, self.max_parallel)
+        else:
+            limit = self.limit
+        if limit != self.limit:
+            logging.info(
+                "Adjusting concurrency from %d to %d workers (max %d): "
+                "%d workers running, %.1f idle CPU cores, %.2f GiB available "
+                "memory, %.2f GiB max worker RSS.", self.limit, limit,
+                self.max_parallel, num_workers, num_idle_cores,
+                available_memory / 2**30, worker_rss / 2**30)
+            self.limit = limit
+
+
+def _parse_worker_reply(reply: str, run_index: int) -> int:
+    """Parses the reply of a persistent worker to a run.
+
+    Args:
+        reply: Tab-separated line with the run index and the exit code.
+        run_index: Run index of the submitted run.
+
+    Returns:
+        The exit code of the run.
+
+    Raises:
+        ValueError: If the reply is malformed or refers to another run.
+    """
+    fields = reply.rstrip("\n").split("\t")
+    if len(fields) != 2:
+        raise ValueError(f"Expected 2 reply fields: {reply!r}.")
+    reply_run_index, exit_code = int(fields[0]), int(fields[1])
+    if reply_run_index != run_index:
+        raise ValueError(f"Expected a reply to run {run_index}: {reply!r}.")
+    return exit_code
+
+
+class _PersistentWorker:
+    """A persistent worker is a long-lived Unity process that executes one run
+    after another.
+
+    Each persistent worker listens on its own local job server socket, to which
+    the Unity process connects after startup. A dedicated thread sends the
+    submitted runs to the Unity process as tab-separated jobs and reports each
+    run once the Unity process has replied with its exit code.
+
+    Attributes:
+        process: Unity worker process.
+        is_connected: True until the connection to the Unity process is lost.
+    """
+
+    def __init__(
+        self,
+        worker_index: int,
+        binary_path: Path,
+        unity_log_dir: Path,
+        finished_runs: queue.SimpleQueue[tuple[int, int | None, WorkerUsage]],
+    ):
+        self._server = socket.create_server(("127.0.0.1", 0))
+        host, port = self._server.getsockname()[:2]
+        self._finished_runs = finished_runs
+        self._jobs: queue.SimpleQueue[RunDescriptor |
+                                      None] = (queue.SimpleQueue())
+        self.is_connected = True
+        self.process = subprocess.Popen([
+            str(binary_path),
+            "--job_server",
+            f"{host}:{port}",
+            "-batchmode",
+            "-nographics",
+            "-logFile",
+            str(unity_log_dir / f"worker_{worker_index}.log"),
+        ])
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def submit(self, descriptor: RunDescriptor) -> None:
+        """Submits a run to the worker."""
+        self._jobs.put(descriptor)
+
+    def close(self) -> None:
+        """Closes the connection to the worker after all submitted runs, which
+        causes the Unity process to quit."""
+        self._jobs.put(None)
+
+    def _accept(self) -> socket.socket | None:
+        """Waits for the Unity process to connect to the job server.
+
+        Returns:
+            The connection or None if the Unity process has exited.
+        """
+        with self._server:
+            self._server.settimeout(PERSISTENT_WORKER_CONNECT_INTERVAL)
+            while self.process.poll() is None:
+                try:
+                    connection, _ = self._server.accept()
+                except TimeoutError:
+                    continue
+                connection.settimeout(None)
+                return connection
+        return None
+
+    def _serve(self) -> None:
+        """Sends the submitted runs to the Unity process and reports each run
+        once it has finished.
+
+        If the connection to the Unity process is lost or the Unity process
+        sends a malformed reply, the current run and all further submitted runs
+        are reported without an exit code.
+        """
+        connection = self._accept()
+        stream = (connection.makefile("rw", encoding="utf-8", newline="\n")
+                  if connection is not None else None)
+        while (descriptor := self._jobs.get()) is not None:
+            start_time = time.monotonic()
+            exit_code = None
+            if self.is_connected and stream is not None:
+                try:
+                    stream.write(f"{descriptor.run_index}\t"
+                                 f"{descriptor.simulation_config_file}\t"
+                                 f"{descriptor.seed}\t"
+                                 f"{descriptor.output_dir}\n")
+                    stream.flush()
+                    reply = stream.readline()
+                except OSError:
+                    reply = ""
+                if reply:
+                    try:
+                        exit_code = _parse_worker_reply(reply,
+                                                        descriptor.run_index)
+                    except ValueError as e:
+                        logging.error(
+                            "Received a malformed reply from worker process "
+                            "%d: %s", self.process.pid, e)
+            if exit_code is None and self.is_connected:
+                self.is_connected = False
+                logging.error("Lost the connection to worker process %d.",
+                              self.process.pid)
+            self._finished_runs.put((
+                descriptor.run_index,
+                exit_code,
+                WorkerUsage(wall_time=time.monotonic() - start_time),
+            ))
+        if connection is not None:
+            stream.close()
+            connection.close()
+
+
+class PersistentWorkerPool:
+    """A pool of persistent workers that each execute many runs.
+
+    Each Unity player is only started once and then executes one run after
+    another, so the Unity player startup is amortized over many runs. New
+    persistent workers are started on demand whenever a run is submitted and
+    no persistent worker is idle.
+
+    Attributes:
+        processes: Unity processes of all persistent workers.
+    """
+
+    def __init__(
+        self,
+        binary_path: Path,
+        unity_log_dir: Path,
+        finished_runs: queue.SimpleQueue[tuple[int, int | None, WorkerUsage]],
+    ):
+        self._binary_path = binary_path
+        self._unity_log_dir = unity_log_dir
+        self._finished_runs = finished_runs
+        self._workers: list[_PersistentWorker] = []
+        self._idle_workers: list[_PersistentWorker] = []
+        self._busy_workers: dict[int, _PersistentWorker] = {}
+
+    @property
+    def processes(self) -> list[subprocess.Popen[bytes]]:
+        return [worker.process for worker in self._workers]
+
+    def submit(self, descriptor: RunDescriptor) -> subprocess.Popen[bytes]:
+        """Submits a run to an idle persistent worker.
+
+        Args:
+            descriptor: Run descriptor.
+
+        Returns:
+            The Unity process that executes the run.
+        """
+        if self._idle_workers:
+            worker = self._idle_workers.pop()
+        else:
+            worker = _PersistentWorker(len(self._workers), self._binary_path,
+                                       self._unity_log_dir, self._finished_runs)
+            self._workers.append(worker)
+        self._busy_workers[descriptor.run_index] = worker
+        worker.submit(descriptor)
+        return worker.process
+
+    def release(self, run_index: int) -> None:
+        """Releases the persistent worker of a finished run.
+
+        The persistent worker becomes idle unless its connection has been
+        lost, in which case it is closed and replaced on demand.
+
+        Args:
+            run_index: Run index of the finished run.
+        """
+        worker = self._busy_workers.pop(run_index)
+        if worker.is_connected:
+            self._idle_workers.append(worker)
+        else:
+            worker.close()
+
+    def close(self) -> None:
+        """Closes all persistent workers and waits for them to quit."""
+        for worker in self._workers:
+            worker.close()
+        deadline = time.monotonic() + PERSISTENT_WORKER_SHUTDOWN_TIMEOUT
+        for worker in self._workers:
+            try:
+                worker.process.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                logging.warning("Worker process %d did not quit.",
+                                worker.process.pid)
+        _terminate_processes(self.processes)
+
+
+def _read_cpu_times() -> tuple[int, int]:
+    """Returns the idle and total CPU times since boot from /proc/stat.
+
+    The CPU times are given in units of clock ticks.
+    """
+    with open("/proc/stat") as f:
+        # The first line contains the aggregate CPU times: user, nice, system,
+        # idle, iowait, irq, softirq, and steal.
+        times = [int(value) for value in f.readline().split()[1:9]]
+    return times[3] + times[4], sum(times)
+
+
+def _read_memory() -> tuple[int, int]:
+    """Returns the available and total memory in bytes from /proc/meminfo."""
+    meminfo = {}
+    with open("/proc/meminfo") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            meminfo[key] = int(value.split()[0]) * 1024
+    return meminfo["MemAvailable"], meminfo["MemTotal"]
+
+
+def _read_process_rss(pid: int) -> int:
+    """Returns the resident set size of the process in bytes.
+
+    Args:
+        pid: Process ID.
+
+    Returns:
+        The resident set size in bytes or 0 if the process has exited.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (FileNotFoundError, ProcessLookupError):
+        return 0
+
+
 def _resolve_binary_path(path: str) -> Path:
     """Resolves the path to the Unity executable.
 
@@ -72,7 +833,7 @@ def _resolve_binary_path(path: str) -> Path:
     return binary_path.resolve()
 
 
-def _resolve_run_config_path(path: str) -> Path:
+def resolve_run_config_path(path: str) -> Path:
     """Resolves the path to a run configuration file.
 
     Args:
@@ -93,7 +854,7 @@ def _resolve_run_config_path(path: str) -> Path:
     raise FileNotFoundError(f"Run configuration file not found: {path}.")
 
 
-def _parse_run_config(path: Path) -> run_config_pb2.RunConfig:
+def parse_run_config(path: Path) -> run_config_pb2.RunConfig:
     """Parses a run configuration proto from text format.
 
     Args:
@@ -106,12 +867,34 @@ def _parse_run_config(path: Path) -> run_config_pb2.RunConfig:
     return google.protobuf.text_format.Parse(path.read_text(), run_config)
 
 
-def _plan_run_descriptors(
+def _parse_simulator_config(path: Path) -> simulator_config_pb2.SimulatorConfig:
+    """Parses a simulator configuration proto from text format.
+
+    Args:
+        path: Path to the simulator configuration proto in text format.
+
+    Returns:
+        The parsed simulator configuration proto.
+    """
+    simulator_config = simulator_config_pb2.SimulatorConfig()
+    return google.protobuf.text_format.Parse(path.read_text(), simulator_config)
+
+
+def plan_run_descriptors(
     run_config: run_config_pb2.RunConfig,
     batch_output_dir: Path,
 ) -> list[RunDescriptor]:
     """Returns the deterministic plan of runs to execute.
 
+    A sweep run configuration is expanded into the cartesian product of its
+    simulation configuration files and seed ranges. The runs of the different
+    simulation configurations are interleaved, so that a single worker pool
+    works on all simulation configurations at once, and the runs of each
+    simulation configuration are stored in a separate subdirectory named after
+    the simulation configuration. A run configuration without a sweep is
+    planned as a sweep over its single simulation configuration file and seed
+    range, whose runs are stored directly in the batch output directory.
+
     Args:
         run_config: Run configuration.
         batch_output_dir: Batch output directory.
@@ -119,31 +902,208 @@ def _plan_run_descriptors(
     Returns:
         The list of run descriptors.
     """
+    if run_config.sweep_simulation_config_files:
+        simulation_config_files = list(run_config.sweep_simulation_config_files)
+        simulation_config_dirs = [
+            batch_output_dir / Path(simulation_config_file).stem
+            for simulation_config_file in simulation_config_files
+        ]
+    else:
+        simulation_config_files = [run_config.simulation_config_file]
+        simulation_config_dirs = [batch_output_dir]
+    seed_ranges = (list(run_config.sweep_seed_ranges)
+                   if run_config.sweep_seed_ranges else [
+                       run_config_pb2.SeedRange(
+                           num_runs=run_config.num_runs,
+                           seed=run_config.seed,
+                           seed_stride=run_config.seed_stride,
+                       )
+                   ])
+    seeds = [
+        seed_range.seed + (index * seed_range.seed_stride)
+        for seed_range in seed_ranges
+        for index in range(seed_range.num_runs)
+    ]
+
     descriptors = []
-    for run_index in range(1, run_config.num_runs + 1):
-        seed = run_config.seed + ((run_index - 1) * run_config.seed_stride)
-        descriptors.append(
-            RunDescriptor(
-                run_index=run_index,
-                seed=seed,
-                simulation_config_file=(run_config.simulation_config_file),
-                output_dir=batch_output_dir / (f"run_{run_index}_seed_{seed}"),
-            ))
+    for seed in seeds:
+        for simulation_config_file, simulation_config_dir in zip(
+                simulation_config_files, simulation_config_dirs):
+            run_index = len(descriptors) + 1
+            descriptors.append(
+                RunDescriptor(
+                    run_index=run_index,
+                    seed=seed,
+                    simulation_config_file=simulation_config_file,
+                    output_dir=simulation_config_dir /
+                    f"run_{run_index}_seed_{seed}",
+                ))
     return descriptors
 
 
-def _compute_max_parallel(run_config: run_config_pb2.RunConfig) -> int:
+def shard_run_descriptors(
+    descriptors: list[RunDescriptor],
+    shard_index: int,
+    num_shards: int,
+) -> list[RunDescriptor]:
+    """Returns the runs assigned to the given shard.
+
+    The runs are assigned to the shards in a round-robin fashion, so each
+    shard receives a disjoint, deterministic slice of the planned runs, and
+    runs of neighboring seeds are spread across the shards.
+
+    Args:
+        descriptors: Planned run descriptors of the whole batch.
+        shard_index: Index of the shard.
+        num_shards: Number of shards.
+
+    Returns:
+        The list of run descriptors assigned to the shard.
+    """
+    return descriptors[shard_index::num_shards]
+
+
+def _is_run_complete(
+    descriptor: RunDescriptor,
+    manifest: BatchManifest,
+    require_event_log: bool = False,
+) -> bool:
+    """Returns whether the run has already completed successfully.
+
+    A run is only considered complete if the batch manifest records it as
+    completed and all files that the manifest lists for the run still exist.
+    The presence of log files alone is not sufficient since a worker may have
+    been interrupted after writing only some of its logs or while writing a
+    log. If the event log is required, the manifest must also list an event
+    log for the run.
+
+    Args:
+        descriptor: Run descriptor.
+        manifest: Batch manifest.
+        require_event_log: If true, a run without an event log is incomplete.
+    """
+    record = manifest.runs.get(descriptor.run_index)
+    if (record is None or record.seed != descriptor.seed or
+            record.status != RunStatus.COMPLETED or record.files is None):
+        return False
+    if not descriptor.output_dir.is_dir():
+        return False
+    if not all(
+        (descriptor.output_dir / file).is_file() for file in record.files):
+        return False
+    return not require_event_log or any(
+        fnmatch.fnmatch(Path(file).name, f"{EVENT_LOG_FILE_PREFIX}_*.csv")
+        for file in record.files)
+
+
+def _plan_resumed_run_descriptors(
+    descriptors: list[RunDescriptor],
+    manifest: BatchManifest,
+    require_event_log: bool = False,
+) -> list[RunDescriptor]:
+    """Returns the runs of a resumed batch that still need to be executed.
+
+    The output directories of incomplete runs are removed, so that the runs
+    can be executed again from scratch.
+
+    Args:
+        descriptors: Planned run descriptors of the whole batch.
+        manifest: Batch manifest of the resumed batch.
+        require_event_log: If true, a run without an event log is incomplete.
+
+    Returns:
+        The list of run descriptors of the missing, incomplete, or failed
+        runs.
+    """
+    remaining_descriptors = []
+    for descriptor in descriptors:
+        if _is_run_complete(descriptor, manifest, require_event_log):
+            continue
+        if descriptor.output_dir.exists():
+            logging.warning(
+                "Removing the output directory of incomplete run "
+                "%d: %s.", descriptor.run_index, descriptor.output_dir)
+            shutil.rmtree(descriptor.output_dir)
+        remaining_descriptors.append(descriptor)
+    return remaining_descriptors
+
+
+def _load_expected_durations(
+        prior_batch_output_dir: Path) -> dict[tuple[str, int], float]:
+    """Loads the run durations of an earlier batch as expected durations.
+
+    Only runs that completed successfully are considered. Since the runs are
+    deterministic, a run of the same simulation configuration with the same
+    seed is expected to take a similar amount of time.
+
+    Args:
+        prior_batch_output_dir: Batch output directory of the earlier batch.
+
+    Returns:
+        A map from the simulation configuration file and the seed to the
+        expected wall-clock time in seconds.
+
+    Raises:
+        FileNotFoundError: If the earlier batch has no batch manifest.
+    """
+    manifest = BatchManifest(prior_batch_output_dir)
+    if not manifest.path.exists():
+        raise FileNotFoundError(f"Batch manifest not found: {manifest.path}.")
+    return {
+        (record.simulation_config_file, record.seed): record.wall_time
+        for record in manifest.runs.values()
+        if (record.status == RunStatus.COMPLETED and
+            record.wall_time is not None)
+    }
+
+
+def _order_longest_first(
+    descriptors: list[RunDescriptor],
+    expected_durations: dict[tuple[str, int], float],
+) -> list[RunDescriptor]:
+    """Orders the runs by their expected duration from longest to shortest.
+
+    Launching the longest runs first prevents a single long run from
+    extending the batch while all other workers are idle. Runs without an
+    expected duration are assumed to take the mean expected duration. Runs
+    with the same expected duration keep their planned order. Only the launch
+    order changes, so the seeds and output directories remain deterministic.
+
+    Args:
+        descriptors: Planned run descriptors.
+        expected_durations: Map from the simulation configuration file and the
+            seed to the expected duration.
+
+    Returns:
+        The run descriptors in launch order.
+    """
+    if not expected_durations:
+        return descriptors
+    mean_duration = (sum(expected_durations.values()) / len(expected_durations))
+    return sorted(
+        descriptors,
+        key=lambda descriptor: expected_durations.get((
+            descriptor.simulation_config_file, descriptor.seed), mean_duration),
+        reverse=True,
+    )
+
+
+def _compute_max_parallel(
+    run_config: run_config_pb2.RunConfig,
+    num_runs: int,
+) -> int:
     """Computes the number of worker processes to run concurrently.
 
     Args:
         run_config: Run configuration.
+        num_runs: Number of planned runs.
 
     Returns:
         The maximum number of concurrent worker processes.
     """
     # If max_parallel is unset, it will read 0. In that case, default to 16.
     requested_parallel = run_config.max_parallel if run_config.max_parallel > 0 else 16
-    return min(requested_parallel, run_config.num_runs)
+    return max(min(requested_parallel, num_runs), 1)
 
 
 def _build_worker_command(
@@ -178,11 +1138,186 @@ def _build_worker_command(
     ]
 
 
-def _terminate_processes(processes: list[subprocess.Popen[bytes]]) -> None:
+class _SingleRunWorker:
+    """A worker process that executes a single run.
+
+    The worker process is reaped by its waiter thread only, which reports the
+    run index, exit code, and resource usage of the worker once it has exited.
+    If another thread also polled or waited for the worker process, whichever
+    thread reaped the process second would not find it anymore, so a
+    terminated run could be reported with an exit code of 0. Instead, poll(),
+    wait(), terminate(), and kill() only observe the waiter thread and signal
+    the worker process while it has not been reaped yet.
+
+    On POSIX systems, the worker is reaped with os.wait4(), which also returns
+    its CPU time and peak resident set size. On other platforms, only the
+    wall-clock time is measured.
+
+    Attributes:
+        process: Worker subprocess.
+    """
+
+    def __init__(
+        self,
+        run_index: int,
+        process: subprocess.Popen[bytes],
+        finished_runs: queue.SimpleQueue[tuple[int, int | None, WorkerUsage]],
+    ):
+        self.process = process
+        self._run_index = run_index
+        self._start_time = time.monotonic()
+        self._finished_runs = finished_runs
+        self._exited = threading.Event()
+        # Lock that prevents the worker process from being signaled while it
+        # is being reaped.
+        self._reap_lock = threading.Lock()
+        threading.Thread(target=self._wait, daemon=True).start()
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def poll(self) -> int | None:
+        """Returns the exit code of the worker or None if it is running."""
+        return self.process.returncode if self._exited.is_set() else None
+
+    def wait(self, timeout: float | None = None) -> int:
+        """Waits for the worker to exit and returns its exit code.
+
+        Args:
+            timeout: Maximum time in seconds to wait. If None, wait until the
+                worker has exited.
+
+        Raises:
+            subprocess.TimeoutExpired: If the worker has not exited before the
+                timeout.
+        """
+        if not self._exited.wait(timeout):
+            raise subprocess.TimeoutExpired(self.process.args, timeout)
+        return self.process.returncode
+
+    def terminate(self) -> None:
+        """Terminates the worker process."""
+        self._send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """Kills the worker process."""
+        # Windows has no SIGKILL, but os.kill() terminates the process
+        # forcefully for any signal other than the console control events.
+        self._send_signal(getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    def _send_signal(self, sig: int) -> None:
+        """Sends the signal to the worker process unless it has exited."""
+        with self._reap_lock:
+            if self._exited.is_set():
+                return
+            try:
+                os.kill(self.process.pid, sig)
+            except ProcessLookupError:
+                # The worker process has already exited.
+                pass
+
+    def _wait(self) -> None:
+        """Reaps the worker process once it has exited and reports the run."""
+        rusage = None
+        if hasattr(os, "wait4"):
+            reap_lock = contextlib.nullcontext()
+            if hasattr(os, "waitid"):
+                # Wait for the worker process to exit without reaping it, so
+                # that it is never signaled after its process ID has been
+                # released.
+                os.waitid(os.P_PID, self.process.pid, os.WEXITED | os.WNOWAIT)
+                reap_lock = self._reap_lock
+            with reap_lock:
+                _, status, rusage = os.wait4(self.process.pid, 0)
+                self.process.returncode = os.waitstatus_to_exitcode(status)
+                self._exited.set()
+        else:
+            self.process.wait()
+            self._exited.set()
+        wall_time = time.monotonic() - self._start_time
+
+        if rusage is None:
+            self._finished_runs.put((self._run_index, self.process.returncode,
+                                     WorkerUsage(wall_time=wall_time)))
+            return
+        # The peak resident set size is reported in bytes on macOS and in
+        # kilobytes on Linux.
+        peak_rss = (rusage.ru_maxrss
+                    if sys.platform == "darwin" else rusage.ru_maxrss * 1024)
+        self._finished_runs.put((self._run_index, self.process.returncode,
+                                 WorkerUsage(
+                                     wall_time=wall_time,
+                                     user_time=rusage.ru_utime,
+                                     system_time=rusage.ru_stime,
+                                     peak_rss=peak_rss,
+                                 )))
+
+
+def _reap_finished_runs(
+    finished_runs: queue.SimpleQueue[tuple[int, int | None, WorkerUsage]],
+    timeout: float | None = None,
+) -> list[tuple[int, int | None, WorkerUsage]]:
+    """Blocks until at least one run has finished and returns the run indices,
+    exit codes, and resource usage of all runs that have finished.
+
+    Args:
+        finished_runs: Queue to which the run indices, exit codes, and resource
+            usage of finished runs are reported.
+        timeout: Maximum time in seconds to block. If None, block until a run
+            has finished.
+
+    Returns:
+        The run indices, exit codes, and resource usage of all finished runs,
+        which is empty if the timeout has expired.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        poll_interval = FINISHED_RUNS_POLL_INTERVAL
+        if deadline is not None:
+            poll_interval = min(max(deadline - time.monotonic(), 0),
+                                poll_interval)
+        try:
+            runs = [finished_runs.get(timeout=poll_interval)]
+            break
+        except queue.Empty:
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+    while True:
+        try:
+            runs.append(finished_runs.get_nowait())
+        except queue.Empty:
+            return runs
+
+
+def _list_output_files(output_dir: Path) -> list[Path]:
+    """Returns all files in the output directory and its subdirectories in
+    sorted order.
+
+    Args:
+        output_dir: Output directory.
+    """
+    return sorted(path for path in output_dir.rglob("*") if path.is_file())
+
+
+def _compute_telemetry_bytes(output_dir: Path) -> int:
+    """Returns the total size of the binary telemetry files in the output
+    directory in bytes.
+
+    Args:
+        output_dir: Output directory.
+    """
+    return sum(path.stat().st_size for path in output_dir.glob(
+        f"{TELEMETRY_FILE_PREFIX}_*{TELEMETRY_BINARY_FILE_EXTENSION}"))
+
+
+def _terminate_processes(
+        processes: list[subprocess.Popen[bytes] | _SingleRunWorker]) -> None:
     """Terminates all worker processes.
 
     Args:
-        processes: Running worker subprocesses to terminate.
+        processes: Running worker subprocesses or single-run workers to
+            terminate.
     """
     for process in processes:
         if process.poll() is None:
@@ -210,14 +1345,50 @@ def run_batch(
     descriptors: list[RunDescriptor],
     unity_log_dir: Path,
     max_parallel: int,
+    manifest: BatchManifest,
+    keep_going: bool = False,
+    adaptive_parallelism: AdaptiveParallelism | None = None,
+    persistent_workers: bool = False,
+    progress: BatchProgress | None = None,
+    watchdog: RunWatchdog | None = None,
+    max_retries: int = 0,
+    require_event_log: bool = False,
 ) -> None:
     """Executes the planned batch of runs.
 
+    Each worker is waited for by a dedicated thread, which reports the run to
+    the scheduler as soon as the worker exits. The scheduler blocks until at
+    least one run has finished, reaps all finished runs at once, and
+    immediately launches new runs in their place. With persistent workers, the
+    runs are instead submitted to a pool of long-lived workers, which report
+    each run as soon as it has finished.
+
+    The outcome of each run is recorded in the batch manifest. By default, the
+    batch is aborted as soon as a run fails. If keep_going is true, failed runs
+    are only recorded, and the remaining runs are still executed. If the
+    watchdog detects a hung run, its worker is terminated, and the run is
+    recorded as timed out. A timed-out run is retried with the same seed up to
+    the maximum number of retries before it counts as failed.
+
     Args:
         binary_path: Path to the Unity executable.
         descriptors: Planned run descriptors.
         unity_log_dir: Directory for Unity log files.
         max_parallel: Maximum number of concurrent workers.
+        manifest: Batch manifest in which to record the outcome of each run.
+        keep_going: If true, continue executing the remaining runs after a run
+            fails.
+        adaptive_parallelism: If given, adapts the number of concurrent
+            workers up to the maximum number of concurrent workers.
+        persistent_workers: If true, execute the runs on persistent workers
+            that each execute many runs instead of launching one worker per
+            run.
+        progress: If given, tracks and periodically reports the progress of
+            the batch.
+        watchdog: If given, detects hung runs and terminates their workers.
+        max_retries: Maximum number of times to retry a timed-out run.
+        require_event_log: If true, a run that has not written an event log
+            has failed.
 
     Raises:
         FileExistsError: If a run output directory already exists.
@@ -227,105 +1398,288 @@ def run_batch(
     next_descriptor_index = 0
     running_workers: dict[
         int,
-        tuple[RunDescriptor, subprocess.Popen[bytes]],
+        tuple[RunDescriptor, subprocess.Popen[bytes] | _SingleRunWorker],
     ] = {}
+    finished_runs: queue.SimpleQueue[tuple[int, int | None,
+                                           WorkerUsage]] = (queue.SimpleQueue())
+    worker_pool = (PersistentWorkerPool(binary_path, unity_log_dir,
+                                        finished_runs)
+                   if persistent_workers else None)
+    failed_run_indices = []
+    timed_out_run_indices = set()
+    retried_descriptors: collections.deque[RunDescriptor] = (
+        collections.deque())
+    num_retries: collections.Counter[int] = collections.Counter()
 
     try:
-        while next_descriptor_index < len(descriptors) or running_workers:
-            while (next_descriptor_index < len(descriptors) and
-                   len(running_workers) < max_parallel):
-                descriptor = descriptors[next_descriptor_index]
-                next_descriptor_index += 1
+        while (next_descriptor_index < len(descriptors) or
+               retried_descriptors or running_workers):
+            parallel = (adaptive_parallelism.limit
+                        if adaptive_parallelism is not None else max_parallel)
+            while ((next_descriptor_index < len(descriptors) or
+                    retried_descriptors) and len(running_workers) < parallel):
+                if retried_descriptors:
+                    descriptor = retried_descriptors.popleft()
+                    logging.info("Relaunching run %d with seed %d (%d/%d).",
+                                 descriptor.run_index, descriptor.seed,
+                                 num_retries[descriptor.run_index], max_retries)
+                else:
+                    descriptor = descriptors[next_descriptor_index]
+                    next_descriptor_index += 1
+                    logging.info("Launching run %d with seed %d (%d/%d).",
+                                 descriptor.run_index, descriptor.seed,
+                                 next_descriptor_index, len(descriptors))
 
                 if descriptor.output_dir.exists():
                     raise FileExistsError(
                         "Run output directory already exists: "
                         f"{descriptor.output_dir}.")
 
+                if progress is not None:
+                    progress.start_run(descriptor)
+                if watchdog is not None:
+                    watchdog.start_run(descriptor)
+
+                if worker_pool is not None:
+                    process = worker_pool.submit(descriptor)
+                    running_workers[descriptor.run_index] = (descriptor,
+                                                             process)
+                    continue
+
                 command = _build_worker_command(
                     binary_path,
                     descriptor,
                     unity_log_dir,
                 )
-
-                logging.info("Launching run %d/%d with seed %d.",
-                             descriptor.run_index, len(descriptors),
-                             descriptor.seed)
-
                 running_workers[descriptor.run_index] = (
                     descriptor,
-                    subprocess.Popen(command),
+                    _SingleRunWorker(descriptor.run_index,
+                                     subprocess.Popen(command), finished_runs),
                 )
 
-            finished_run_index = None
-            for run_index, (descriptor, process) in running_workers.items():
-                exit_code = process.poll()
-                if exit_code is None:
-                    continue
-
-                if exit_code != 0:
-                    raise RuntimeError(
-                        f"Run {run_index} exited with code {exit_code}.")
-                if not descriptor.output_dir.is_dir():
-                    raise RuntimeError(
+            # Only sample the resources while there are runs left to launch.
+            timeouts = []
+            if (adaptive_parallelism is not None and
+                    next_descriptor_index < len(descriptors)):
+                adaptive_parallelism.update(
+                    [process.pid for _, process in running_workers.values()])
+                timeouts.append(
+                    adaptive_parallelism.get_time_until_next_sample())
+            if progress is not None:
+                progress.report()
+                time_until_next_report = progress.get_time_until_next_report()
+                if time_until_next_report is not None:
+                    timeouts.append(time_until_next_report)
+            if watchdog is not None:
+                for run_index, reason in watchdog.find_hung_runs():
+                    watchdog.stop_run(run_index)
+                    process = running_workers[run_index][1]
+                    # If the worker has exited in the meantime, its exit code
+                    # decides whether the run succeeded.
+                    if process.poll() is not None:
+                        continue
+                    logging.warning("%s Terminating its worker.", reason)
+                    timed_out_run_indices.add(run_index)
+                    _terminate_processes([process])
+                timeouts.append(watchdog.get_time_until_next_check())
+            for run_index, exit_code, usage in _reap_finished_runs(
+                    finished_runs, min(timeouts, default=None)):
+                descriptor, _ = running_workers.pop(run_index)
+                if worker_pool is not None:
+                    worker_pool.release(run_index)
+                if watchdog is not None:
+                    watchdog.stop_run(run_index)
+                status = RunStatus.FAILED
+                if run_index in timed_out_run_indices:
+                    timed_out_run_indices.remove(run_index)
+                    status = RunStatus.TIMED_OUT
+                    error = f"Run {run_index} timed out."
+                elif exit_code is None:
+                    error = f"Run {run_index} lost its worker."
+                elif exit_code != 0:
+                    error = f"Run {run_index} exited with code {exit_code}."
+                elif not descriptor.output_dir.is_dir():
+                    error = (
                         f"Run {run_index} did not create an output directory.")
-                logging.info(
-                    "Completed run %d with seed %d.",
-                    descriptor.run_index,
-                    descriptor.seed,
-                )
-
-                finished_run_index = run_index
-                break
-
-            if finished_run_index is None:
-                time.sleep(0.1)
-                continue
-
-            del running_workers[finished_run_index]
+                elif require_event_log and not any(
+                        descriptor.output_dir.glob(
+                            f"{EVENT_LOG_FILE_PREFIX}_*.csv")):
+                    error = f"Run {run_index} did not write an event log."
+                else:
+                    error = None
+
+                output_files = (_list_output_files(descriptor.output_dir)
+                                if descriptor.output_dir.is_dir() else None)
+                if (status == RunStatus.TIMED_OUT and
+                        num_retries[run_index] < max_retries):
+                    manifest.record(descriptor, status, exit_code, usage,
+                                    output_files)
+                    if descriptor.output_dir.exists():
+                        shutil.rmtree(descriptor.output_dir)
+                    num_retries[run_index] += 1
+                    retried_descriptors.append(descriptor)
+                    if progress is not None:
+                        progress.retry_run(run_index)
+                    logging.warning("%s Retrying it with the same seed.", error)
+                    continue
+                if progress is not None:
+                    progress.finish_run(run_index,
+                                        usage.wall_time,
+                                        failed=error is not None)
+                if error is None:
+                    manifest.record(descriptor, RunStatus.COMPLETED, exit_code,
+                                    usage, output_files)
+                    logging.info(
+                        "Completed run %d with seed %d in %.1f s.",
+                        descriptor.run_index,
+                        descriptor.seed,
+                        usage.wall_time,
+                    )
+                    continue
+                manifest.record(descriptor, status, exit_code, usage,
+                                output_files)
+                if not keep_going:
+                    raise RuntimeError(error)
+                logging.error("%s Continuing with the remaining runs.", error)
+                failed_run_indices.append(run_index)
     except BaseException:
         _terminate_processes(
+            worker_pool.processes if worker_pool is not None else
             [process for _, process in running_workers.values()])
         raise
+    finally:
+        manifest.save()
+
+    if worker_pool is not None:
+        worker_pool.close()
+
+    if failed_run_indices:
+        raise RuntimeError(
+            f"{len(failed_run_indices)} of {len(descriptors)} runs failed: "
+            f"{', '.join(map(str, sorted(failed_run_indices)))}. "
+            f"See {manifest.path} for details.")
 
 
 def main(argv):
     assert len(argv) == 1, argv
 
     binary_path = _resolve_binary_path(FLAGS.binary_path)
-    run_config_path = _resolve_run_config_path(FLAGS.run_config)
-    run_config = _parse_run_config(run_config_path)
+    run_config_path = resolve_run_config_path(FLAGS.run_config)
+    run_config = parse_run_config(run_config_path)
+    simulator_config = _parse_simulator_config(
+        Path(FLAGS.simulator_config).expanduser())
+
+    if FLAGS.shard_index >= FLAGS.num_shards:
+        raise ValueError(f"Shard index {FLAGS.shard_index} is out of range "
+                         f"for {FLAGS.num_shards} shards.")
 
     # Initialize the log directories.
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_root_dir = Path(FLAGS.log_root_dir).expanduser().resolve()
-    batch_output_dir = log_root_dir / f"{run_config.name}_{timestamp}"
+    resume = FLAGS.resume is not None
+    if resume:
+        batch_output_dir = Path(FLAGS.resume).expanduser().resolve()
+        if not batch_output_dir.is_dir():
+            raise FileNotFoundError(
+                f"Batch output directory not found: {batch_output_dir}.")
+        log_root_dir = batch_output_dir.parent
+    else:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        log_root_dir = Path(FLAGS.log_root_dir).expanduser().resolve()
+        batch_name = f"{run_config.name}_{timestamp}"
+        if FLAGS.num_shards > 1:
+            batch_name += f"_shard_{FLAGS.shard_index}_of_{FLAGS.num_shards}"
+        batch_output_dir = log_root_dir / batch_name
     unity_log_dir = (Path(FLAGS.unity_log_dir).expanduser().resolve()
                      if FLAGS.unity_log_dir is not None else
                      (log_root_dir / f"{batch_output_dir.name}_unity_logs"))
-    batch_output_dir.mkdir(parents=True, exist_ok=False)
-    unity_log_dir.mkdir(parents=True, exist_ok=False)
+    batch_output_dir.mkdir(parents=True, exist_ok=resume)
+    unity_log_dir.mkdir(parents=True, exist_ok=resume)
+
+    # A resumed batch keeps the shard recorded in its batch manifest.
+    manifest = BatchManifest(batch_output_dir)
+    if resume and manifest.path.exists():
+        for flag_name in ("shard_index", "num_shards"):
+            flag = FLAGS[flag_name]
+            recorded_value = getattr(manifest, flag_name)
+            if flag.present and flag.value != recorded_value:
+                raise ValueError(
+                    f"The resumed batch was run with --{flag_name}="
+                    f"{recorded_value}, but --{flag_name}={flag.value} was "
+                    "given.")
+    else:
+        manifest.shard_index = FLAGS.shard_index
+        manifest.num_shards = FLAGS.num_shards
+        manifest.save()
+    shard_index = manifest.shard_index
+    num_shards = manifest.num_shards
 
     # Plan all of the runs to execute.
-    descriptors = _plan_run_descriptors(
+    descriptors = plan_run_descriptors(
         run_config,
         batch_output_dir,
     )
+    descriptors = shard_run_descriptors(descriptors, shard_index, num_shards)
+    if resume:
+        num_planned_runs = len(descriptors)
+        descriptors = _plan_resumed_run_descriptors(
+            descriptors, manifest, simulator_config.enable_event_logging)
+        logging.info("Resuming batch with %d of %d runs remaining.",
+                     len(descriptors), num_planned_runs)
+
+    if FLAGS.prior_batch_dir is not None:
+        expected_durations = _load_expected_durations(
+            Path(FLAGS.prior_batch_dir).expanduser().resolve())
+        logging.info(
+            "Launching runs longest-expected-first based on %d run durations "
+            "from %s.", len(expected_durations), FLAGS.prior_batch_dir)
+        descriptors = _order_longest_first(descriptors, expected_durations)
 
     # Compute the maximum number of parallel executions.
-    max_parallel = _compute_max_parallel(run_config)
-
-    logging.info("Launching %d runs from %s.", len(descriptors),
-                 run_config_path)
+    max_parallel = _compute_max_parallel(run_config, len(descriptors))
+    adaptive_parallelism = None
+    if FLAGS.adaptive_parallelism:
+        if AdaptiveParallelism.is_supported():
+            adaptive_parallelism = AdaptiveParallelism(max_parallel)
+        else:
+            logging.warning(
+                "Adaptive parallelism is not supported on %s. "
+                "Running up to %d workers concurrently.", platform.system(),
+                max_parallel)
+
+    if num_shards > 1:
+        logging.info("Launching %d runs from %s as shard %d of %d.",
+                     len(descriptors), run_config_path, shard_index, num_shards)
+    else:
+        logging.info("Launching %d runs from %s.", len(descriptors),
+                     run_config_path)
     logging.info(
         "Batch output directory: %s.",
         batch_output_dir,
     )
+    progress = BatchProgress(batch_output_dir, len(descriptors),
+                             FLAGS.progress_interval)
+    progress.save()
+    stall_timeout = FLAGS.stall_timeout
+    if stall_timeout > 0 and not simulator_config.enable_telemetry_logging:
+        # Without telemetry, every run would appear stalled.
+        logging.warning(
+            "Telemetry logging is disabled in %s, so stalled runs cannot be "
+            "detected. Ignoring --stall_timeout.", FLAGS.simulator_config)
+        stall_timeout = 0
+    watchdog = (RunWatchdog(FLAGS.run_timeout, stall_timeout)
+                if FLAGS.run_timeout > 0 or stall_timeout > 0 else None)
     run_batch(
         binary_path,
         descriptors,
         unity_log_dir,
         max_parallel,
+        manifest,
+        FLAGS.keep_going,
+        adaptive_parallelism,
+        FLAGS.persistent_workers,
+        progress,
+        watchdog,
+        FLAGS.max_retries,
+        simulator_config.enable_event_logging,
     )
 
     logging.info("All %d runs completed successfully.", len(descriptors))
@@ -335,6 +1689,10 @@ if __name__ == "__main__":
     flags.DEFINE_string("binary_path", None, "Path to the Unity executable.")
     flags.DEFINE_string("run_config", None,
                         "Run configuration path or filename.")
+    flags.DEFINE_string(
+        "simulator_config", str(SIMULATOR_CONFIG_FILE),
+        "Simulator configuration with which the Unity executable was built. "
+        "It determines which logs each run is expected to write.")
     flags.DEFINE_string(
         "log_root_dir", unity_utils.get_persistent_data_directory(),
         "Root directory in which to create the batch output directory.")
@@ -342,6 +1700,74 @@ if __name__ == "__main__":
         "unity_log_dir", None,
         "Directory in which to store the per-run Unity logs. "
         "Defaults to a sibling directory next to the batch output directory.")
+    flags.DEFINE_string(
+        "resume", None,
+        "Batch output directory of an interrupted batch to resume. Only the "
+        "runs that are missing or have failed are executed again.")
+    flags.DEFINE_bool(
+        "keep_going", False,
+        "If true, record failed runs in the batch manifest and continue with "
+        "the remaining runs instead of aborting the batch.")
+    flags.DEFINE_integer(
+        "shard_index",
+        0,
+        "Index of the shard of the batch to run on this host.",
+        lower_bound=0,
+    )
+    flags.DEFINE_integer(
+        "num_shards",
+        1,
+        "Number of shards into which to split the batch across hosts. Use "
+        "merge_batch_shards.py to merge the shards into a single batch.",
+        lower_bound=1,
+    )
+    flags.DEFINE_float(
+        "progress_interval",
+        60,
+        "Interval in seconds at which to log the progress of the batch. If 0, "
+        "the progress is only written to the batch status file whenever a run "
+        "finishes.",
+        lower_bound=0,
+    )
+    flags.DEFINE_float(
+        "run_timeout",
+        0,
+        "Maximum wall-clock time of a run in seconds, after which its worker "
+        "is terminated and the run is recorded as timed out. If 0, the run "
+        "time is unlimited.",
+        lower_bound=0,
+    )
+    flags.DEFINE_float(
+        "stall_timeout",
+        0,
+        "Maximum time in seconds that a run may go without writing any "
+        "telemetry, after which its worker is terminated and the run is "
+        "recorded as timed out. If 0, stalled runs are not detected. Stalled "
+        "runs are only detected if telemetry logging is enabled in the "
+        "simulator configuration, so use --run_timeout otherwise.",
+        lower_bound=0,
+    )
+    flags.DEFINE_integer(
+        "max_retries",
+        0,
+        "Maximum number of times to retry a timed-out run with the same seed.",
+        lower_bound=0,
+    )
+    flags.DEFINE_bool(
+        "persistent_workers", False,
+        "If true, launch long-lived Unity workers that each execute many runs "
+        "received over a local socket instead of one worker per run, so the "
+        "Unity player startup is only paid once per worker.")
+    flags.DEFINE_string(
+        "prior_batch_dir", None,
+        "Batch output directory of an earlier batch of the same simulation "
+        "configuration. If given, the runs are launched in the order of their "
+        "expected duration from the earlier batch manifest, longest first.")
+    flags.DEFINE_bool(
+        "adaptive_parallelism", False,
+        "If true, adapt the number of concurrent workers to the available CPU "
+        "cores and memory, up to max_parallel from the run configuration. "
+        "Only supported on Linux.")
     flags.mark_flags_as_required(["binary_path", "run_config"])
 
     app.run(main)
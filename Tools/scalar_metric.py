@@ -6,8 +6,8 @@ This file defines the scalar metric base class and all implementations thereof.
 from abc import abstractmethod
 
 import numpy as np
-import pandas as pd
-from constants import AgentType, Column, EventType
+from constants import AgentType, EventType
+from event_summary import BatchEventSummary, EventSummary
 from metric import Metric
 
 
@@ -17,11 +17,11 @@ class ScalarMetric(Metric):
     """
 
     @abstractmethod
-    def emit(self, event_df: pd.DataFrame) -> int | float:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> int | float:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
 
 
@@ -33,15 +33,23 @@ class NumMissileInterceptors(ScalarMetric):
         """Returns the name of the metric."""
         return "Number of missile interceptors"
 
-    def emit(self, event_df: pd.DataFrame) -> int:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> int:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
-        return sum(
-            (event_df[Column.AGENT_TYPE] == AgentType.MISSILE_INTERCEPTOR) &
-            (event_df[Column.EVENT] == EventType.NEW_INTERCEPTOR))
+        return summary.count(EventType.NEW_INTERCEPTOR,
+                             AgentType.MISSILE_INTERCEPTOR)
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        return summary.counts(EventType.NEW_INTERCEPTOR,
+                              AgentType.MISSILE_INTERCEPTOR)
 
 
 class NumMissileInterceptorHits(ScalarMetric):
@@ -52,15 +60,23 @@ class NumMissileInterceptorHits(ScalarMetric):
         """Returns the name of the metric."""
         return "Number of missile interceptor hits"
 
-    def emit(self, event_df: pd.DataFrame) -> int:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> int:
+        """Evaluates the metric from the given event summary.
+
+        Args:
+            summary: Event summary of a single simulation run.
+        """
+        return summary.count(EventType.INTERCEPTOR_HIT,
+                             AgentType.MISSILE_INTERCEPTOR)
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Batch event summary of all simulation runs.
         """
-        return sum(
-            (event_df[Column.AGENT_TYPE] == AgentType.MISSILE_INTERCEPTOR) &
-            (event_df[Column.EVENT] == EventType.INTERCEPTOR_HIT))
+        return summary.counts(EventType.INTERCEPTOR_HIT,
+                              AgentType.MISSILE_INTERCEPTOR)
 
 
 class NumMissileInterceptorMisses(ScalarMetric):
@@ -71,15 +87,23 @@ class NumMissileInterceptorMisses(ScalarMetric):
         """Returns the name of the metric."""
         return "Number of missile interceptor misses"
 
-    def emit(self, event_df: pd.DataFrame) -> int:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> int:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
-        return sum(
-            (event_df[Column.AGENT_TYPE] == AgentType.MISSILE_INTERCEPTOR) &
-            (event_df[Column.EVENT] == EventType.INTERCEPTOR_MISS))
+        return summary.count(EventType.INTERCEPTOR_MISS,
+                             AgentType.MISSILE_INTERCEPTOR)
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        return summary.counts(EventType.INTERCEPTOR_MISS,
+                              AgentType.MISSILE_INTERCEPTOR)
 
 
 class NumMissileInterceptorsDestroyed(ScalarMetric):
@@ -92,15 +116,23 @@ class NumMissileInterceptorsDestroyed(ScalarMetric):
         """Returns the name of the metric."""
         return "Number of missile interceptors destroyed"
 
-    def emit(self, event_df: pd.DataFrame) -> int:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> int:
+        """Evaluates the metric from the given event summary.
+
+        Args:
+            summary: Event summary of a single simulation run.
+        """
+        return summary.count(EventType.INTERCEPTOR_DESTROYED,
+                             AgentType.MISSILE_INTERCEPTOR)
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Batch event summary of all simulation runs.
         """
-        return sum(
-            (event_df[Column.AGENT_TYPE] == AgentType.MISSILE_INTERCEPTOR) &
-            (event_df[Column.EVENT] == EventType.INTERCEPTOR_DESTROYED))
+        return summary.counts(EventType.INTERCEPTOR_DESTROYED,
+                              AgentType.MISSILE_INTERCEPTOR)
 
 
 class MissileInterceptorHitRate(ScalarMetric):
@@ -111,21 +143,37 @@ class MissileInterceptorHitRate(ScalarMetric):
         """Returns the name of the metric."""
         return "Missile interceptor hit rate"
 
-    def emit(self, event_df: pd.DataFrame) -> float:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> float:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
         num_missile_interceptor_hits = (
-            NumMissileInterceptorHits().emit(event_df))
+            NumMissileInterceptorHits().evaluate(summary))
         num_missile_interceptor_misses = (
-            NumMissileInterceptorMisses().emit(event_df))
+            NumMissileInterceptorMisses().evaluate(summary))
         total = num_missile_interceptor_hits + num_missile_interceptor_misses
         if total == 0:
             return 0
         return num_missile_interceptor_hits / total
 
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        num_missile_interceptor_hits = (
+            NumMissileInterceptorHits().evaluate_batch(summary))
+        num_missile_interceptor_misses = (
+            NumMissileInterceptorMisses().evaluate_batch(summary))
+        total = num_missile_interceptor_hits + num_missile_interceptor_misses
+        return np.divide(num_missile_interceptor_hits,
+                         total,
+                         out=np.zeros(summary.num_runs),
+                         where=total > 0)
+
 
 class MissileInterceptorEfficiency(ScalarMetric):
     """A metric for the missile interceptor efficiency.
@@ -139,19 +187,34 @@ class MissileInterceptorEfficiency(ScalarMetric):
         """Returns the name of the metric."""
         return "Missile interceptor efficiency"
 
-    def emit(self, event_df: pd.DataFrame) -> float:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> float:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
-        num_missile_interceptors = NumMissileInterceptors().emit(event_df)
+        num_missile_interceptors = NumMissileInterceptors().evaluate(summary)
         num_missile_interceptor_hits = (
-            NumMissileInterceptorHits().emit(event_df))
+            NumMissileInterceptorHits().evaluate(summary))
         if num_missile_interceptors == 0:
             return 0
         return num_missile_interceptor_hits / num_missile_interceptors
 
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        num_missile_interceptors = (
+            NumMissileInterceptors().evaluate_batch(summary))
+        num_missile_interceptor_hits = (
+            NumMissileInterceptorHits().evaluate_batch(summary))
+        return np.divide(num_missile_interceptor_hits,
+                         num_missile_interceptors,
+                         out=np.zeros(summary.num_runs),
+                         where=num_missile_interceptors > 0)
+
 
 class MinInterceptDistance(ScalarMetric):
     """A metric for the minimum intercept distance."""
@@ -161,21 +224,30 @@ class MinInterceptDistance(ScalarMetric):
         """Returns the name of the metric."""
         return "Minimum intercept distance"
 
-    def emit(self, event_df: pd.DataFrame) -> float:
-        """Emits the metric from the given event log.
+    def evaluate(self, summary: EventSummary) -> float:
+        """Evaluates the metric from the given event summary.
 
         Args:
-            event_df: Dataframe containing the events.
+            summary: Event summary of a single simulation run.
         """
-        interceptor_hits = (
-            event_df[event_df[Column.EVENT] == EventType.INTERCEPTOR_HIT])
-        if interceptor_hits.empty:
+        interceptor_hit_positions = summary.positions(EventType.INTERCEPTOR_HIT)
+        if interceptor_hit_positions.size == 0:
             return np.inf
-        interceptor_hit_positions = interceptor_hits[[
-            Column.POSITION_X,
-            Column.POSITION_Y,
-            Column.POSITION_Z,
-        ]]
-        interceptor_hit_distances = np.linalg.norm(
-            interceptor_hit_positions.to_numpy(), axis=1)
+        interceptor_hit_distances = np.linalg.norm(interceptor_hit_positions,
+                                                   axis=1)
         return np.min(interceptor_hit_distances)
+
+    def evaluate_batch(self, summary: BatchEventSummary) -> np.ndarray:
+        """Evaluates the metric for all simulation runs in a batch at once.
+
+        Args:
+            summary: Batch event summary of all simulation runs.
+        """
+        run_indices, interceptor_hit_positions = summary.positions(
+            EventType.INTERCEPTOR_HIT)
+        interceptor_hit_distances = np.linalg.norm(interceptor_hit_positions,
+                                                   axis=1)
+        min_intercept_distances = np.full(summary.num_runs, np.inf)
+        np.minimum.at(min_intercept_distances, run_indices,
+                      interceptor_hit_distances)
+        return min_intercept_distances
@@ -0,0 +1,205 @@
+"""A streaming distribution analyzes the statistics of scalar metric values
+over multiple simulation runs while the runs are being processed.
+
+Unlike a distribution, a streaming distribution does not store the metric
+values, so its memory usage is constant in the number of simulation runs.
+"""
+
+import math
+
+from event_summary import EventSummary
+from scalar_metric import ScalarMetric
+
+
+class _P2QuantileSketch:
+    """Approximate quantile sketch using the P-square algorithm.
+
+    The P-square algorithm tracks five markers whose heights approximate the
+    minimum, the p/2-quantile, the p-quantile, the (1+p)/2-quantile, and the
+    maximum. After each value, the marker heights are adjusted with a
+    piecewise-parabolic interpolation, so the sketch requires constant memory.
+
+    See R. Jain and I. Chlamtac, "The P² algorithm for dynamic calculation of
+    quantiles and histograms without storing observations," Communications of
+    the ACM, 1985.
+    """
+
+    _NUM_MARKERS = 5
+
+    def __init__(self, quantile: float):
+        self._quantile = quantile
+        # Marker heights.
+        self._heights: list[float] = []
+        # Actual marker positions.
+        self._positions = list(range(self._NUM_MARKERS))
+        # Desired marker positions and their increments.
+        self._desired_positions = [
+            0, 2 * quantile, 4 * quantile, 2 + 2 * quantile, 4
+        ]
+        self._desired_position_increments = [
+            0, quantile / 2, quantile, (1 + quantile) / 2, 1
+        ]
+
+    def add(self, value: float) -> None:
+        """Adds a value to the sketch."""
+        heights = self._heights
+        if len(heights) < self._NUM_MARKERS:
+            heights.append(value)
+            heights.sort()
+            return
+
+        # Find the cell containing the value and update the extreme markers.
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[-1]:
+            heights[-1] = value
+            cell = self._NUM_MARKERS - 2
+        else:
+            cell = next(index for index in range(self._NUM_MARKERS - 1)
+                        if heights[index] <= value < heights[index + 1])
+
+        # Increment the positions of the markers above the cell.
+        for index in range(cell + 1, self._NUM_MARKERS):
+            self._positions[index] += 1
+        for index in range(self._NUM_MARKERS):
+            self._desired_positions[index] += (
+                self._desired_position_increments[index])
+
+        # Adjust the heights of the middle markers if necessary.
+        positions = self._positions
+        for index in range(1, self._NUM_MARKERS - 1):
+            offset = self._desired_positions[index] - positions[index]
+            if ((offset >= 1 and positions[index + 1] - positions[index] > 1) or
+                (offset <= -1 and
+                 positions[index - 1] - positions[index] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self._interpolate_parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = self._interpolate_linear(index, step)
+                heights[index] = height
+                positions[index] += step
+
+    def get(self) -> float:
+        """Returns the estimated quantile.
+
+        Raises:
+            ValueError: If no values have been added.
+        """
+        heights = self._heights
+        if not heights:
+            raise ValueError("The quantile sketch is empty.")
+        if len(heights) < self._NUM_MARKERS:
+            # Interpolate linearly between the few values seen so far.
+            rank = self._quantile * (len(heights) - 1)
+            lower = math.floor(rank)
+            upper = math.ceil(rank)
+            fraction = rank - lower
+            return heights[lower] + fraction * (heights[upper] - heights[lower])
+        return heights[2]
+
+    def _interpolate_parabolic(self, index: int, step: int) -> float:
+        """Returns the piecewise-parabolic prediction of the marker height."""
+        heights = self._heights
+        positions = self._positions
+        return heights[index] + step / (
+            positions[index + 1] - positions[index - 1]) * (
+                (positions[index] - positions[index - 1] + step) *
+                (heights[index + 1] - heights[index]) /
+                (positions[index + 1] - positions[index]) +
+                (positions[index + 1] - positions[index] - step) *
+                (heights[index] - heights[index - 1]) /
+                (positions[index] - positions[index - 1]))
+
+    def _interpolate_linear(self, index: int, step: int) -> float:
+        """Returns the linear prediction of the marker height."""
+        heights = self._heights
+        positions = self._positions
+        slope = (heights[index + step] -
+                 heights[index]) / (positions[index + step] - positions[index])
+        return heights[index] + step * slope
+
+
+class StreamingDistribution:
+    """A streaming distribution analyzes the statistics of scalar metric values
+    as they are added one by one.
+
+    The count, mean, and variance are updated with Welford's algorithm, and the
+    median is estimated with an approximate quantile sketch.
+
+    Attributes:
+        metric: Scalar metric whose values are analyzed.
+        count: Number of metric values.
+    """
+
+    def __init__(self, metric: ScalarMetric):
+        self.metric = metric
+        self.count = 0
+        # Welford's algorithm only tracks the finite values. The sum of the
+        # non-finite values determines the mean if there are any.
+        self._num_finite = 0
+        self._non_finite_sum = 0.0
+        self._mean = 0.0
+        # Sum of the squared differences from the mean.
+        self._m2 = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+        self._median_sketch = _P2QuantileSketch(0.5)
+
+    def update(self, summary: EventSummary) -> None:
+        """Evaluates the metric on a simulation run and adds its value.
+
+        Args:
+            summary: Event summary of a single simulation run.
+        """
+        self.add(self.metric.evaluate(summary))
+
+    def add(self, value: int | float) -> None:
+        """Adds a metric value to the distribution.
+
+        Args:
+            value: Metric value.
+        """
+        self.count += 1
+        if math.isfinite(value):
+            self._num_finite += 1
+            delta = value - self._mean
+            self._mean += delta / self._num_finite
+            self._m2 += delta * (value - self._mean)
+        else:
+            self._non_finite_sum += value
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._median_sketch.add(value)
+
+    def min(self) -> float:
+        """Returns the minimum of the metric values."""
+        if self.count == 0:
+            raise ValueError("The list of metric values is empty.")
+        return self._min
+
+    def max(self) -> float:
+        """Returns the maximum of the metric values."""
+        if self.count == 0:
+            raise ValueError("The list of metric values is empty.")
+        return self._max
+
+    def mean(self) -> float:
+        """Returns the mean of the metric values."""
+        if self.count == 0:
+            return math.nan
+        if self._num_finite < self.count:
+            return self._non_finite_sum
+        return self._mean
+
+    def median(self) -> float:
+        """Returns the approximate median of the metric values."""
+        if self.count == 0:
+            return math.nan
+        return self._median_sketch.get()
+
+    def std(self) -> float:
+        """Returns the standard deviation of the metric values."""
+        if self.count == 0 or self._num_finite < self.count:
+            return math.nan
+        return math.sqrt(self._m2 / self.count)
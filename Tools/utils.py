@@ -1,26 +1,94 @@
 """Implements various utility functions."""
 
+import collections
+import concurrent.futures
+import contextlib
+import fnmatch
+import itertools
+import json
+import mmap
 import re
+import zipfile
+from collections.abc import Iterator
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from absl import logging
-from constants import EVENT_LOG_FILE_PREFIX, TELEMETRY_FILE_PREFIX
+from constants import (AGENT_TYPE_FROM_VALUE, BATCH_MANIFEST_FILE,
+                       EVENT_LOG_CACHE_FILE, EVENT_LOG_FILE_PREFIX,
+                       TELEMETRY_BINARY_FILE_EXTENSION,
+                       TELEMETRY_FILE_EXTENSIONS, TELEMETRY_FILE_PREFIX,
+                       AgentType, Column, RunStatus)
 
 _RUN_DIRECTORY_PATTERN = re.compile(r"run_(\d+)_seed_\d+")
 
+# Minimum number of event logs to parse per worker process.
+_MIN_EVENT_LOGS_PER_WORKER = 4
+
+# Maximum number of event logs per worker process that are being parsed or
+# have been parsed but not yet consumed.
+_MAX_PENDING_EVENT_LOGS_PER_WORKER = 4
+
+# Size in bytes of the time and the agent type at the start of each binary
+# telemetry record.
+_TELEMETRY_RECORD_HEADER_SIZE = 8
+
+# Size in bytes of the position and velocity at the end of each binary
+# telemetry record.
+_TELEMETRY_RECORD_STATE_SIZE = 24
+
+# Size in bytes of a binary telemetry record with an empty agent ID.
+_TELEMETRY_MIN_RECORD_SIZE = (_TELEMETRY_RECORD_HEADER_SIZE + 1 +
+                              _TELEMETRY_RECORD_STATE_SIZE)
+
+# Record layout of the memory-mapped telemetry file.
+_TELEMETRY_MEMMAP_RECORD_DTYPE = np.dtype([
+    ("time", "<f4"),
+    ("agent_index", "<i4"),
+    ("position", "<f4", (3,)),
+    ("velocity", "<f4", (3,)),
+])
+
+# Number of telemetry records that are converted at once when generating the
+# memory-mapped telemetry file.
+_TELEMETRY_MEMMAP_CHUNK_SIZE = 1 << 16
+
+# Suffix of the memory-mapped telemetry records file.
+_TELEMETRY_MEMMAP_RECORDS_SUFFIX = "_records.npy"
+
+# Suffix of the memory-mapped telemetry agents file.
+_TELEMETRY_MEMMAP_AGENTS_SUFFIX = "_agents.npy"
+
+# Telemetry columns containing the agent state in the order in which they are
+# written to the binary telemetry file.
+_TELEMETRY_STATE_COLUMNS = (
+    Column.POSITION_X,
+    Column.POSITION_Y,
+    Column.POSITION_Z,
+    Column.VELOCITY_X,
+    Column.VELOCITY_Y,
+    Column.VELOCITY_Z,
+)
+
 
 def find_all_files(directory: str, file_pattern: str) -> list[Path]:
     """Returns all files in the directory and its subdirectories that match the
     file pattern.
 
-    If no files match the given pattern, returns an empty list.
+    If the directory is a batch output directory with a batch manifest, only
+    the files of the completed runs listed in the batch manifest are returned
+    without walking the directory. If a listed file no longer exists, the
+    batch manifest is stale, and the directory is walked instead. If no files
+    match the given pattern, returns an empty list.
 
     Args:
         directory: Directory to look through.
         file_pattern: File pattern to match.
     """
-    files = list(Path(directory).rglob(file_pattern))
+    files = _find_files_in_batch_manifest(directory, file_pattern)
+    if files is None:
+        files = list(Path(directory).rglob(file_pattern))
     if not files:
         logging.warning(
             "No files found matching the pattern %s in the directory: %s.",
@@ -28,14 +96,62 @@ def find_all_files(directory: str, file_pattern: str) -> list[Path]:
     return files
 
 
+def _find_files_in_batch_manifest(
+    directory: str,
+    file_pattern: str,
+) -> list[Path] | None:
+    """Returns the files of the completed runs in the batch manifest of the
+    directory that match the file pattern.
+
+    Args:
+        directory: Batch output directory.
+        file_pattern: File pattern to match against the file names.
+
+    Returns:
+        The list of matching files or None if the directory has no batch
+        manifest, the batch manifest does not list the files of each run, or a
+        matching file of a completed run no longer exists.
+    """
+    manifest_path = Path(directory) / BATCH_MANIFEST_FILE
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except FileNotFoundError:
+        return None
+
+    files = []
+    for run in manifest["runs"]:
+        # Batch manifests written by earlier versions of the batch run
+        # launcher do not list the files of each run.
+        if "files" not in run:
+            return None
+        if run["status"] != RunStatus.COMPLETED:
+            continue
+        output_dir = Path(directory) / run["output_dir"]
+        for file in run["files"] or []:
+            if not fnmatch.fnmatchcase(Path(file).name, file_pattern):
+                continue
+            path = output_dir / file
+            # The output directory of a run may have been moved or deleted
+            # since the batch manifest was written.
+            if not path.is_file():
+                logging.warning(
+                    "The batch manifest %s lists a missing file %s. Searching "
+                    "the directory instead.", manifest_path, path)
+                return None
+            files.append(path)
+    return files
+
+
 def find_all_telemetry_files(log_dir: str) -> list[Path]:
     """Returns all telemetry files in the directory and its subdirectories.
 
+    If a telemetry file exists in both the binary and the CSV format, only the
+    binary telemetry file is returned.
+
     Args:
         log_dir: Log directory.
     """
-    return sorted(find_all_files(log_dir, f"{TELEMETRY_FILE_PREFIX}_*.csv"),
-                  key=_run_log_sort_key)
+    return sorted(_find_telemetry_files(log_dir), key=_run_log_sort_key)
 
 
 def find_all_event_logs(log_dir: str) -> list[Path]:
@@ -48,6 +164,26 @@ def find_all_event_logs(log_dir: str) -> list[Path]:
                   key=_run_log_sort_key)
 
 
+def _find_telemetry_files(log_dir: str) -> list[Path]:
+    """Returns all telemetry files in the directory and its subdirectories,
+    preferring the binary format over the CSV format.
+
+    Args:
+        log_dir: Log directory.
+    """
+    telemetry_files: dict[Path, Path] = {}
+    for path in find_all_files(log_dir, f"{TELEMETRY_FILE_PREFIX}_*"):
+        if path.suffix not in TELEMETRY_FILE_EXTENSIONS:
+            continue
+        stem_path = path.with_suffix("")
+        existing_path = telemetry_files.get(stem_path)
+        if (existing_path is None or
+                TELEMETRY_FILE_EXTENSIONS.index(path.suffix)
+                < TELEMETRY_FILE_EXTENSIONS.index(existing_path.suffix)):
+            telemetry_files[stem_path] = path
+    return list(telemetry_files.values())
+
+
 def _run_log_sort_key(path: Path) -> tuple[int, int, str]:
     """Returns a stable numeric sort key for batch run log files."""
     for parent in path.parents:
@@ -78,10 +214,18 @@ def find_latest_file(directory: str, file_pattern: str) -> Path | None:
 def find_latest_telemetry_file(log_dir: str) -> Path | None:
     """Returns the latest telemetry file.
 
+    If the latest telemetry file exists in both the binary and the CSV format,
+    the binary telemetry file is returned.
+
     Args:
         log_dir: Log directory.
     """
-    return find_latest_file(log_dir, f"{TELEMETRY_FILE_PREFIX}_*.csv")
+    files = _find_telemetry_files(log_dir)
+    if not files:
+        return None
+    latest_file = max(files, key=lambda path: path.stat().st_mtime)
+    logging.info("Found latest file: %s.", latest_file)
+    return latest_file
 
 
 def find_latest_event_log(log_dir: str) -> Path | None:
@@ -144,28 +288,1200 @@ def find_latest_subdirectory(
     return latest_subdir
 
 
-def read_telemetry_file(path: str | Path) -> pd.DataFrame:
+def read_telemetry_file(
+    path: str | Path,
+    start_time: float | None = None,
+    end_time: float | None = None,
+    agent_types: list[str] | None = None,
+    agent_ids: list[str] | None = None,
+) -> pd.DataFrame:
     """Reads the telemetry file into a dataframe.
 
+    The file format is determined by the file extension. Binary telemetry files
+    are decoded directly, and all other files are parsed as CSV files.
+
+    If any filter is given, the records are instead read from the memory-mapped
+    view of the telemetry file, so only the records of the selected agents
+    within the time window are read from disk. However, the first filtered
+    read of a telemetry file parses the whole telemetry file to generate the
+    memory-mapped layout, which takes time proportional to the size of the
+    telemetry file. Only subsequent reads scale with the number of selected
+    records.
+
     Args:
         path: Path to the telemetry file.
+        start_time: Optional start time of the records to read (inclusive).
+        end_time: Optional end time of the records to read (inclusive).
+        agent_types: Optional agent types of the records to read.
+        agent_ids: Optional agent IDs of the records to read.
 
     Returns:
         A dataframe containing the telemetry data.
+
+    Raises:
+        ValueError: If an agent type or an agent ID does not exist.
     """
+    if (start_time is not None or end_time is not None or
+            agent_types is not None or agent_ids is not None):
+        telemetry = open_telemetry_memmap(path)
+        agent_indices = telemetry.select_agents(agent_types, agent_ids)
+        records = telemetry.window_records(
+            start_time if start_time is not None else -np.inf,
+            end_time if end_time is not None else np.inf,
+            agent_indices,
+        )
+        return telemetry.to_dataframe(records)
+    if Path(path).suffix == TELEMETRY_BINARY_FILE_EXTENSION:
+        return read_telemetry_binary(path)
     return pd.read_csv(path)
 
 
-def read_event_log(path: str | Path) -> pd.DataFrame:
+def simplify_trajectories(
+    telemetry_df: pd.DataFrame,
+    tolerance: float,
+    event_df: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Simplifies the trajectory of each agent within the tolerance.
+
+    The trajectories are simplified with the Ramer-Douglas-Peucker algorithm
+    using the synchronized Euclidean distance, i.e., the distance between each
+    dropped sample and the position linearly interpolated in time between the
+    retained samples. Therefore, both the shape of the trajectory and the
+    position of the agent at any time deviate by at most the tolerance. The
+    first and last samples of each agent as well as the samples around each
+    event are always retained. All segments of all agents are split in
+    lockstep, so each iteration is vectorized over all agents.
+
+    Args:
+        telemetry_df: Dataframe containing the telemetry data.
+        tolerance: Maximum position error in meters. If zero, the telemetry
+            data is returned unchanged.
+        event_df: Optional dataframe containing the events whose samples to
+            retain.
+
+    Returns:
+        A dataframe containing the retained telemetry samples grouped by agent
+        and ordered by time.
+    """
+    if tolerance <= 0 or telemetry_df.empty:
+        return telemetry_df
+
+    agent_codes, agent_ids = pd.factorize(telemetry_df[Column.AGENT_ID])
+    order = np.lexsort((telemetry_df[Column.TIME].to_numpy(), agent_codes))
+    times = telemetry_df[Column.TIME].to_numpy(dtype=np.float64)[order]
+    positions = telemetry_df[[
+        Column.POSITION_X,
+        Column.POSITION_Y,
+        Column.POSITION_Z,
+    ]].to_numpy(dtype=np.float64)[order]
+    agent_codes = agent_codes[order]
+
+    # Retain the first and last samples of each agent.
+    num_samples = len(times)
+    keep = np.zeros(num_samples, dtype=bool)
+    is_agent_start = np.ones(num_samples, dtype=bool)
+    is_agent_start[1:] = agent_codes[1:] != agent_codes[:-1]
+    keep[is_agent_start] = True
+    keep[np.roll(is_agent_start, -1)] = True
+
+    # Retain the samples immediately before and after each event.
+    if event_df is not None and not event_df.empty:
+        event_agent_codes = agent_ids.get_indexer(event_df[Column.AGENT_ID])
+        is_known_agent = event_agent_codes >= 0
+        # Map each sample and each event to a key that is sorted by agent and
+        # then by time.
+        min_time = times.min()
+        max_time = times.max()
+        time_range = max_time - min_time + 1
+        sample_keys = agent_codes + (times - min_time) / time_range
+        event_times = np.clip(
+            event_df[Column.TIME].to_numpy(dtype=np.float64)[is_known_agent],
+            min_time, max_time)
+        event_keys = (event_agent_codes[is_known_agent] +
+                      (event_times - min_time) / time_range)
+        event_indices = np.searchsorted(sample_keys, event_keys)
+        keep[np.clip(event_indices, 0, num_samples - 1)] = True
+        keep[np.clip(event_indices - 1, 0, num_samples - 1)] = True
+
+    # Split the segments between consecutive retained samples of each agent
+    # until all dropped samples are within the tolerance.
+    retained_indices = np.flatnonzero(keep)
+    is_same_agent = (
+        agent_codes[retained_indices[:-1]] == agent_codes[retained_indices[1:]])
+    segment_starts = retained_indices[:-1][is_same_agent]
+    segment_ends = retained_indices[1:][is_same_agent]
+    while True:
+        num_interior_samples = segment_ends - segment_starts - 1
+        has_interior_samples = num_interior_samples > 0
+        segment_starts = segment_starts[has_interior_samples]
+        segment_ends = segment_ends[has_interior_samples]
+        num_interior_samples = num_interior_samples[has_interior_samples]
+        if len(segment_starts) == 0:
+            break
+
+        # Gather the interior samples of all segments.
+        segment_offsets = np.concatenate(
+            ([0], np.cumsum(num_interior_samples)[:-1]))
+        segment_indices = np.repeat(np.arange(len(segment_starts)),
+                                    num_interior_samples)
+        sample_indices = (np.arange(num_interior_samples.sum()) -
+                          segment_offsets[segment_indices] +
+                          segment_starts[segment_indices] + 1)
+
+        # Compute the synchronized Euclidean distance of each interior sample.
+        starts = segment_starts[segment_indices]
+        ends = segment_ends[segment_indices]
+        durations = times[ends] - times[starts]
+        fractions = np.divide(times[sample_indices] - times[starts],
+                              durations,
+                              out=np.zeros_like(durations),
+                              where=durations > 0)
+        start_positions = positions[starts]
+        interpolated_positions = start_positions + (
+            fractions[:, np.newaxis] * (positions[ends] - start_positions))
+        distances = np.linalg.norm(positions[sample_indices] -
+                                   interpolated_positions,
+                                   axis=1)
+
+        # Split each segment at its farthest sample if it exceeds the
+        # tolerance.
+        max_distances = np.maximum.reduceat(distances, segment_offsets)
+        is_farthest = distances == max_distances[segment_indices]
+        _, first_farthest = np.unique(segment_indices[is_farthest],
+                                      return_index=True)
+        farthest_indices = np.flatnonzero(is_farthest)[first_farthest]
+        split_indices = sample_indices[farthest_indices]
+        is_split = max_distances > tolerance
+        split_indices = split_indices[is_split]
+        keep[split_indices] = True
+        segment_starts, segment_ends = (
+            np.concatenate((segment_starts[is_split], split_indices)),
+            np.concatenate((split_indices, segment_ends[is_split])),
+        )
+
+    return telemetry_df.iloc[order[keep]]
+
+
+class EventLogCache:
+    """A columnar cache of the parsed event logs within a log directory.
+
+    All cached event logs are stored in a single file in the log directory.
+    Each event log is keyed by its path relative to the log directory, its
+    size, and its modification time, so an event log is only parsed again if
+    it has changed. String columns are stored as integer codes into a table of
+    unique values.
+
+    Attributes:
+        path: Path to the cache file.
+    """
+
+    def __init__(self, log_dir: str | Path):
+        self._log_dir = Path(log_dir)
+        self.path = self._log_dir / EVENT_LOG_CACHE_FILE
+
+        # Map from the event log key to its size, modification time, and
+        # index in the cache file.
+        self._entries: dict[str, tuple[int, int, int]] = {}
+        self._arrays: dict[str, np.ndarray] = {}
+        self._load()
+
+        # Map from the event log key to its size, modification time, and either
+        # its dataframe or its index in the cache file for all event logs
+        # accessed since the cache was loaded. Cached event logs are only
+        # referenced by their index, so they are not all kept in memory.
+        self._accessed: dict[str, tuple[int, int, pd.DataFrame | int]] = {}
+        self._is_modified = False
+
+    def contains(self, path: str | Path) -> bool:
+        """Returns whether the event log is cached and has not changed since it
+        was cached without reading it.
+
+        Args:
+            path: Path to the event log.
+        """
+        key, size, mtime = self._get_key(path)
+        entry = self._entries.get(key)
+        return entry is not None and entry[:2] == (size, mtime)
+
+    def get(self, path: str | Path) -> pd.DataFrame | None:
+        """Returns the cached dataframe of the event log.
+
+        Args:
+            path: Path to the event log.
+
+        Returns:
+            The cached dataframe or None if the event log is not cached or has
+            changed since it was cached.
+        """
+        key, size, mtime = self._get_key(path)
+        entry = self._entries.get(key)
+        if entry is None or entry[:2] != (size, mtime):
+            return None
+        self._accessed[key] = (size, mtime, entry[2])
+        return self._read_entry(entry[2])
+
+    def put(self, path: str | Path, df: pd.DataFrame) -> None:
+        """Adds the dataframe of the event log to the cache.
+
+        Args:
+            path: Path to the event log.
+            df: Dataframe containing the events.
+        """
+        key, size, mtime = self._get_key(path)
+        self._accessed[key] = (size, mtime, df)
+        self._is_modified = True
+
+    def save(self) -> None:
+        """Writes all event logs accessed since the cache was loaded to the
+        cache file.
+
+        The cache file is only rewritten if an event log was added or if an
+        event log in the cache file was not accessed.
+        """
+        if not self._is_modified and self._accessed.keys(
+        ) == self._entries.keys():
+            return
+
+        keys = list(self._accessed)
+        dfs = [
+            self._read_entry(df) if isinstance(df, int) else df
+            for _, _, df in self._accessed.values()
+        ]
+        arrays = {
+            "keys":
+                np.array(keys, dtype=str),
+            "sizes":
+                np.array([self._accessed[key][0] for key in keys],
+                         dtype=np.int64),
+            "mtimes":
+                np.array([self._accessed[key][1] for key in keys],
+                         dtype=np.int64),
+            "offsets":
+                np.concatenate(
+                    ([0], np.cumsum([len(df) for df in dfs]))).astype(np.int64),
+        }
+        # Empty event logs, e.g., of aborted runs, are parsed with object
+        # columns, which would upcast the numeric columns of all event logs
+        # when concatenated. They contribute no rows, so they are skipped
+        # unless all event logs are empty.
+        non_empty_dfs = [df for df in dfs if not df.empty] or dfs
+        combined_df = (pd.concat(non_empty_dfs, ignore_index=True)
+                       if non_empty_dfs else pd.DataFrame())
+        arrays["columns"] = np.array(combined_df.columns, dtype=str)
+        for index, column in enumerate(combined_df.columns):
+            values = combined_df[column]
+            if pd.api.types.is_numeric_dtype(values):
+                arrays[f"values_{index}"] = values.to_numpy()
+            else:
+                codes, uniques = pd.factorize(values)
+                arrays[f"codes_{index}"] = codes
+                arrays[f"uniques_{index}"] = np.array(uniques, dtype=str)
+
+        # Write to a temporary file first, so that an interrupted write does
+        # not corrupt the cache.
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        temp_path.replace(self.path)
+        logging.info("Saved %d event logs to the event log cache: %s.",
+                     len(keys), self.path)
+
+    def _load(self) -> None:
+        """Loads the cache file if it exists."""
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as cache_file:
+                arrays = {key: cache_file[key] for key in cache_file.files}
+            self._entries = {
+                str(key): (int(size), int(mtime), index)
+                for index, (key, size, mtime) in enumerate(
+                    zip(arrays["keys"], arrays["sizes"], arrays["mtimes"]))
+            }
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logging.warning("Ignoring invalid event log cache %s: %s.",
+                            self.path, e)
+            self._entries = {}
+            return
+        self._arrays = arrays
+
+    def _read_entry(self, index: int) -> pd.DataFrame:
+        """Reads the dataframe at the given index in the cache file.
+
+        Args:
+            index: Index of the event log in the cache file.
+        """
+        start = self._arrays["offsets"][index]
+        end = self._arrays["offsets"][index + 1]
+        data = {}
+        for column_index, column in enumerate(self._arrays["columns"]):
+            values_key = f"values_{column_index}"
+            if values_key in self._arrays:
+                data[str(column)] = self._arrays[values_key][start:end].copy()
+                continue
+            # Missing values are encoded as -1, which selects the appended NaN.
+            uniques = np.append(
+                self._arrays[f"uniques_{column_index}"].astype(object), np.nan)
+            data[str(column)] = uniques[self._arrays[f"codes_{column_index}"]
+                                        [start:end]]
+        return pd.DataFrame(data)
+
+    def _get_key(self, path: str | Path) -> tuple[str, int, int]:
+        """Returns the cache key, size, and modification time of the event log.
+
+        Args:
+            path: Path to the event log.
+        """
+        path = Path(path)
+        stat = path.stat()
+        try:
+            key = path.resolve().relative_to(self._log_dir.resolve())
+        except ValueError:
+            key = path.resolve()
+        return key.as_posix(), stat.st_size, stat.st_mtime_ns
+
+
+def read_event_log(
+    path: str | Path,
+    cache: EventLogCache | None = None,
+) -> pd.DataFrame:
     """Reads the event log file into a dataframe.
 
     Args:
         path: Path to the event log.
+        cache: Event log cache to consult first. If the event log is not in
+            the cache or has changed since it was cached, the event log is
+            parsed and added to the cache.
 
     Returns:
         A dataframe containing the events.
     """
+    if cache is not None:
+        df = cache.get(path)
+        if df is not None:
+            return df
     df = pd.read_csv(path)
     # Sanitize the event column to ensure consistency.
     df["Event"] = df["Event"].str.upper().str.strip()
+    if cache is not None:
+        cache.put(path, df)
     return df
+
+
+def read_event_logs(
+    paths: list[Path],
+    cache: EventLogCache | None = None,
+    num_workers: int = 1,
+) -> list[pd.DataFrame]:
+    """Reads the event logs into dataframes, optionally in parallel.
+
+    Event logs that are not found in the cache are parsed and sanitized by a
+    pool of worker processes. If there are too few event logs to parse for
+    the pool startup cost to pay off, the event logs are parsed serially.
+
+    Args:
+        paths: Paths to the event logs.
+        cache: Event log cache to consult first.
+        num_workers: Maximum number of worker processes.
+
+    Returns:
+        A list of dataframes containing the events in the same order as the
+        paths.
+    """
+    return list(iter_event_logs(paths, cache, num_workers))
+
+
+def iter_event_logs(
+    paths: list[Path],
+    cache: EventLogCache | None = None,
+    num_workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """Reads the event logs into dataframes lazily, optionally in parallel.
+
+    Unlike read_event_logs, the dataframes are yielded as soon as they have
+    been read, so the caller can process each event log while the remaining
+    event logs are still being read. The cached event logs are only read from
+    the cache once they are consumed, and only a bounded number of event logs
+    per worker process are parsed ahead of the consumer, so the memory usage
+    does not grow with the number of event logs.
+
+    Args:
+        paths: Paths to the event logs.
+        cache: Event log cache to consult first.
+        num_workers: Maximum number of worker processes.
+
+    Yields:
+        Dataframes containing the events in the same order as the paths.
+    """
+    is_cached = [cache is not None and cache.contains(path) for path in paths]
+    uncached_paths = [
+        path for path, is_path_cached in zip(paths, is_cached)
+        if not is_path_cached
+    ]
+    num_workers = min(num_workers,
+                      len(uncached_paths) // _MIN_EVENT_LOGS_PER_WORKER)
+    with contextlib.ExitStack() as stack:
+        executor = None
+        # Futures of the uncached event logs that are being parsed in order.
+        pending_event_dfs: collections.deque[concurrent.futures.Future[
+            pd.DataFrame]] = collections.deque()
+        uncached_path_iter = iter(uncached_paths)
+        if num_workers > 1:
+            logging.info("Reading %d event logs with %d worker processes.",
+                         len(uncached_paths), num_workers)
+            executor = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(num_workers))
+            for path in itertools.islice(
+                    uncached_path_iter,
+                    num_workers * _MAX_PENDING_EVENT_LOGS_PER_WORKER):
+                pending_event_dfs.append(executor.submit(read_event_log, path))
+
+        for path, is_path_cached in zip(paths, is_cached):
+            if is_path_cached:
+                # The event log is parsed again if it has changed since it was
+                # found in the cache.
+                yield read_event_log(path, cache)
+                continue
+            if executor is not None:
+                event_df = pending_event_dfs.popleft().result()
+                next_path = next(uncached_path_iter, None)
+                if next_path is not None:
+                    pending_event_dfs.append(
+                        executor.submit(read_event_log, next_path))
+            else:
+                event_df = read_event_log(path)
+            if cache is not None:
+                cache.put(path, event_df)
+            yield event_df
+
+
+def read_telemetry_binary(path: str | Path) -> pd.DataFrame:
+    """Reads the binary telemetry file into a dataframe.
+
+    Each record in the binary telemetry file consists of the time as a float,
+    the agent type as an int32, the agent ID as a length-prefixed string, and
+    the position and velocity as six floats, all in little-endian byte order.
+    The returned dataframe has the same columns as the telemetry CSV file.
+    Unlike the CSV file, the values are not rounded to two decimal places.
+
+    Args:
+        path: Path to the binary telemetry file.
+
+    Returns:
+        A dataframe containing the telemetry data.
+
+    Raises:
+        ValueError: If the telemetry file contains an unknown agent type.
+    """
+    times, agent_type_values, agent_codes, agent_ids, states = (
+        _decode_telemetry_binary(Path(path).read_bytes(), path))
+    unique_agent_type_values, agent_type_indices = np.unique(
+        agent_type_values, return_inverse=True)
+    agent_type_names = _get_agent_type_names(unique_agent_type_values, path)
+
+    telemetry = {
+        Column.TIME: times.astype(np.float64),
+        Column.AGENT_TYPE: agent_type_names[agent_type_indices],
+        Column.AGENT_ID: agent_ids[agent_codes],
+    }
+    for index, column in enumerate(_TELEMETRY_STATE_COLUMNS):
+        telemetry[column] = states[:, index].astype(np.float64)
+    return pd.DataFrame(telemetry)
+
+
+def _decode_telemetry_binary(
+    data: bytes | mmap.mmap,
+    path: str | Path,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Decodes the binary telemetry file into NumPy arrays.
+
+    Args:
+        data: Contents of the binary telemetry file.
+        path: Path to the binary telemetry file.
+
+    Returns:
+        A tuple of the time of each record, the integer agent type of each
+        record, the agent code of each record, an object array mapping from the
+        agent code to the agent ID, and an array of shape (num_records, 6)
+        containing the position and velocity of each record.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    return _decode_telemetry_records(data, buffer,
+                                     _index_telemetry_records(data, path))
+
+
+def _decode_telemetry_records(
+    data: bytes | mmap.mmap,
+    buffer: np.ndarray,
+    record_offsets: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Decodes the records at the given byte offsets into NumPy arrays.
+
+    Args:
+        data: Contents of the binary telemetry file.
+        buffer: Byte buffer of the binary telemetry file.
+        record_offsets: Byte offset of each record to decode.
+
+    Returns:
+        A tuple of the time of each record, the integer agent type of each
+        record, the agent code of each record, an object array mapping from the
+        agent code to the agent ID, and an array of shape (num_records, 6)
+        containing the position and velocity of each record.
+    """
+    agent_id_offsets, agent_id_lengths = _decode_agent_id_lengths(
+        data, buffer, record_offsets)
+
+    times = _gather_values(buffer, record_offsets, np.dtype("<f4"), 1)
+    agent_type_values = _gather_values(buffer, record_offsets + 4,
+                                       np.dtype("<i4"), 1)
+    agent_codes, agent_ids = _factorize_agent_ids(buffer, agent_id_offsets,
+                                                  agent_id_lengths)
+    states = _gather_values(buffer, agent_id_offsets + agent_id_lengths,
+                            np.dtype("<f4"), len(_TELEMETRY_STATE_COLUMNS))
+    return (times.ravel(), agent_type_values.ravel(), agent_codes, agent_ids,
+            states)
+
+
+def _get_agent_type_names(
+    agent_type_values: np.ndarray,
+    path: str | Path,
+) -> np.ndarray:
+    """Converts the integer agent types into the agent type names.
+
+    Args:
+        agent_type_values: Integer agent types.
+        path: Path to the binary telemetry file.
+
+    Returns:
+        An object array containing the agent type names.
+
+    Raises:
+        ValueError: If there is an unknown agent type.
+    """
+    unknown_agent_type_values = sorted({
+        int(value)
+        for value in agent_type_values
+        if value not in AGENT_TYPE_FROM_VALUE
+    })
+    if unknown_agent_type_values:
+        raise ValueError(f"Unknown agent types {unknown_agent_type_values} "
+                         f"in the telemetry file: {path}.")
+    return np.array(
+        [str(AGENT_TYPE_FROM_VALUE[value]) for value in agent_type_values],
+        dtype=object,
+    )
+
+
+class TelemetryMemmap:
+    """A read-only, memory-mapped view of a telemetry file.
+
+    The telemetry records are stored on disk with a fixed stride and sorted by
+    agent and then by time, so the records of each agent are contiguous. All
+    arrays are views into the memory-mapped file, so only the pages that are
+    actually accessed are read from disk.
+
+    Attributes:
+        records: Structured array containing all telemetry records.
+        agent_ids: Agent ID of each agent index.
+        agent_types: Agent type of each agent index.
+    """
+
+    def __init__(self, records_path: Path, agents_path: Path):
+        self.records = np.load(records_path, mmap_mode="r")
+        agents = np.load(agents_path)
+        self.agent_ids = agents["agent_id"]
+        self.agent_types = agents["agent_type"]
+        self._agent_starts = agents["start"]
+        self._agent_ends = agents["end"]
+        self._agent_id_to_index = {
+            agent_id: index for index, agent_id in enumerate(self.agent_ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def time(self) -> np.ndarray:
+        """Returns the time of each record."""
+        return self.records["time"]
+
+    @property
+    def agent_index(self) -> np.ndarray:
+        """Returns the agent index of each record."""
+        return self.records["agent_index"]
+
+    @property
+    def position(self) -> np.ndarray:
+        """Returns an array of shape (num_records, 3) containing the position
+        of each record.
+        """
+        return self.records["position"]
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """Returns an array of shape (num_records, 3) containing the velocity
+        of each record.
+        """
+        return self.records["velocity"]
+
+    def agent_records(self, agent_id: str) -> np.ndarray:
+        """Returns the records of the given agent sorted by time.
+
+        The returned records are a view into the memory-mapped file.
+
+        Args:
+            agent_id: Agent ID.
+
+        Raises:
+            KeyError: If the agent does not exist.
+        """
+        agent_index = self._agent_id_to_index[agent_id]
+        return self.records[self._agent_starts[agent_index]:self.
+                            _agent_ends[agent_index]]
+
+    def select_agents(
+        self,
+        agent_types: list[str] | None = None,
+        agent_ids: list[str] | None = None,
+    ) -> np.ndarray:
+        """Returns the indices of the agents matching all given filters.
+
+        Args:
+            agent_types: Optional agent types to select.
+            agent_ids: Optional agent IDs to select.
+
+        Raises:
+            ValueError: If an agent type or an agent ID does not exist.
+        """
+        is_selected = np.ones(len(self.agent_ids), dtype=bool)
+        if agent_types is not None:
+            unknown_agent_types = sorted(
+                set(agent_types) -
+                {str(agent_type) for agent_type in AgentType})
+            if unknown_agent_types:
+                raise ValueError(f"Unknown agent types: {unknown_agent_types}.")
+            is_selected &= np.isin(self.agent_types, agent_types)
+        if agent_ids is not None:
+            unknown_agent_ids = sorted(
+                set(agent_ids) - self._agent_id_to_index.keys())
+            if unknown_agent_ids:
+                raise ValueError(f"Agents not found in the telemetry file: "
+                                 f"{unknown_agent_ids}.")
+            is_selected &= np.isin(self.agent_ids, agent_ids)
+        return np.flatnonzero(is_selected)
+
+    def window_records(
+        self,
+        start_time: float,
+        end_time: float,
+        agent_indices: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Returns the records within the time window sorted by agent and then
+        by time.
+
+        The time window is located with a binary search within the records of
+        each agent, so only the records within the time window are read from
+        disk.
+
+        Args:
+            start_time: Start time of the window (inclusive).
+            end_time: End time of the window (inclusive).
+            agent_indices: Optional indices of the agents whose records to
+                return. If None, the records of all agents are returned.
+        """
+        agent_starts = self._agent_starts
+        agent_ends = self._agent_ends
+        if agent_indices is not None:
+            agent_starts = agent_starts[agent_indices]
+            agent_ends = agent_ends[agent_indices]
+        windows = []
+        for start, end in zip(agent_starts, agent_ends):
+            agent_times = self.records["time"][start:end]
+            window_start = start + np.searchsorted(
+                agent_times, start_time, side="left")
+            window_end = start + np.searchsorted(
+                agent_times, end_time, side="right")
+            if window_start < window_end:
+                windows.append(self.records[window_start:window_end])
+        if not windows:
+            return self.records[:0]
+        return np.concatenate(windows)
+
+    def to_dataframe(self, records: np.ndarray | None = None) -> pd.DataFrame:
+        """Converts the telemetry records into a dataframe.
+
+        The dataframe has the same columns as the telemetry CSV file.
+
+        Args:
+            records: Telemetry records to convert. If None, all telemetry
+                records are converted.
+
+        Returns:
+            A dataframe containing the telemetry data.
+        """
+        if records is None:
+            records = self.records
+        agent_indices = records["agent_index"]
+        telemetry = {
+            Column.TIME: records["time"].astype(np.float64),
+            Column.AGENT_TYPE: self.agent_types[agent_indices].astype(object),
+            Column.AGENT_ID: self.agent_ids[agent_indices].astype(object),
+        }
+        states = np.concatenate((records["position"], records["velocity"]),
+                                axis=1)
+        for index, column in enumerate(_TELEMETRY_STATE_COLUMNS):
+            telemetry[column] = states[:, index].astype(np.float64)
+        return pd.DataFrame(telemetry)
+
+
+def open_telemetry_memmap(path: str | Path) -> TelemetryMemmap:
+    """Opens a memory-mapped view of the telemetry file.
+
+    The fixed-stride layout is generated from the binary or CSV telemetry file
+    the first time that the telemetry file is opened and stored next to it.
+    Generating the layout parses the whole telemetry file, but it is converted
+    in chunks, so the memory usage does not grow with the size of the
+    telemetry file. The layout is regenerated if the telemetry file is modified
+    afterwards.
+
+    Args:
+        path: Path to the binary or CSV telemetry file.
+
+    Returns:
+        A memory-mapped view of the telemetry file.
+    """
+    path = Path(path)
+    records_path = path.with_name(path.stem + _TELEMETRY_MEMMAP_RECORDS_SUFFIX)
+    agents_path = path.with_name(path.stem + _TELEMETRY_MEMMAP_AGENTS_SUFFIX)
+    source_mtime = path.stat().st_mtime
+    if (not records_path.exists() or not agents_path.exists() or
+            records_path.stat().st_mtime < source_mtime or
+            agents_path.stat().st_mtime < source_mtime):
+        logging.info("Generating the memory-mapped telemetry file for: %s.",
+                     path)
+        _write_telemetry_memmap(path, records_path, agents_path)
+    return TelemetryMemmap(records_path, agents_path)
+
+
+def _write_telemetry_memmap(
+    path: Path,
+    records_path: Path,
+    agents_path: Path,
+) -> None:
+    """Writes the fixed-stride layout of the telemetry file.
+
+    The telemetry file is converted in chunks of records in two passes. The
+    first pass counts the records of each agent, and the second pass scatters
+    the records of each chunk into the contiguous range of their agent. Only a
+    single chunk is held in memory at a time in addition to the byte offset of
+    each record of a binary telemetry file, but the whole telemetry file is
+    still read twice.
+
+    Args:
+        path: Path to the binary or CSV telemetry file.
+        records_path: Path to the output records file.
+        agents_path: Path to the output agents file.
+    """
+    # Count the records of each agent.
+    agent_id_to_index: dict[str, int] = {}
+    agent_type_values: list[int | str] = []
+    num_records_per_agent = np.zeros(0, dtype=np.int64)
+    for _, agent_indices, _ in _iter_telemetry_chunks(path, agent_id_to_index,
+                                                      agent_type_values):
+        num_records_per_agent = np.concatenate(
+            (num_records_per_agent,
+             np.zeros(len(agent_id_to_index) - len(num_records_per_agent),
+                      dtype=np.int64)))
+        num_records_per_agent += np.bincount(
+            agent_indices, minlength=len(num_records_per_agent))
+    agent_ends = np.cumsum(num_records_per_agent)
+    agent_starts = agent_ends - num_records_per_agent
+    agent_ids = np.array(list(agent_id_to_index), dtype=object)
+    agent_types = np.array(agent_type_values, dtype=object)
+    if path.suffix == TELEMETRY_BINARY_FILE_EXTENSION:
+        agent_types = _get_agent_type_names(agent_types, path)
+
+    # Write to temporary files first, so that an interrupted conversion does not
+    # leave behind a partial layout.
+    temp_records_path = records_path.with_name(records_path.name + ".tmp")
+    records = np.lib.format.open_memmap(
+        temp_records_path,
+        mode="w+",
+        dtype=_TELEMETRY_MEMMAP_RECORD_DTYPE,
+        shape=(int(num_records_per_agent.sum()),),
+    )
+    # Scatter the records of each chunk behind the already written records of
+    # their agent, preserving the chronological order.
+    agent_cursors = agent_starts.copy()
+    for times, agent_indices, states in _iter_telemetry_chunks(
+            path, agent_id_to_index, agent_type_values):
+        order = np.argsort(agent_indices, kind="stable")
+        sorted_agent_indices = agent_indices[order]
+        num_chunk_records_per_agent = np.bincount(agent_indices,
+                                                  minlength=len(agent_ids))
+        chunk_agent_starts = (np.cumsum(num_chunk_records_per_agent) -
+                              num_chunk_records_per_agent)
+        destinations = (agent_cursors[sorted_agent_indices] +
+                        np.arange(len(order)) -
+                        chunk_agent_starts[sorted_agent_indices])
+        chunk_records = np.empty(len(order),
+                                 dtype=_TELEMETRY_MEMMAP_RECORD_DTYPE)
+        chunk_records["time"] = times[order]
+        chunk_records["agent_index"] = sorted_agent_indices
+        chunk_records["position"] = states[order, :3]
+        chunk_records["velocity"] = states[order, 3:]
+        records[destinations] = chunk_records
+        agent_cursors += num_chunk_records_per_agent
+    records.flush()
+    del records
+
+    agents = np.empty(
+        len(agent_ids),
+        dtype=[
+            ("agent_id", f"U{max(map(len, agent_ids), default=1)}"),
+            ("agent_type", f"U{max(map(len, agent_types), default=1)}"),
+            ("start", "<i8"),
+            ("end", "<i8"),
+        ],
+    )
+    agents["agent_id"] = agent_ids
+    agents["agent_type"] = agent_types
+    agents["start"] = agent_starts
+    agents["end"] = agent_ends
+    temp_agents_path = agents_path.with_name(agents_path.name + ".tmp")
+    with open(temp_agents_path, "wb") as f:
+        np.save(f, agents)
+
+    temp_records_path.replace(records_path)
+    temp_agents_path.replace(agents_path)
+
+
+def _iter_telemetry_chunks(
+    path: Path,
+    agent_id_to_index: dict[str, int],
+    agent_type_values: list[int | str],
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Reads the records of the telemetry file in chronological chunks.
+
+    The agents are indexed in the order in which they first appear. Agents that
+    have not been seen before are added to the agent indices and agent types.
+
+    Args:
+        path: Path to the binary or CSV telemetry file.
+        agent_id_to_index: Map from the agent ID to the agent index, which is
+            updated in place.
+        agent_type_values: Integer agent type or agent type name of each agent
+            index, which is updated in place.
+
+    Yields:
+        A tuple of the time of each record, the agent index of each record, and
+        an array of shape (num_records, 6) containing the position and velocity
+        of each record.
+    """
+    for times, chunk_agent_type_values, agent_codes, agent_ids, states in (
+            _iter_raw_telemetry_chunks(path)):
+        _, first_indices = np.unique(agent_codes, return_index=True)
+        agent_indices = np.empty(len(agent_ids), dtype=np.int64)
+        for agent_code, agent_id in enumerate(agent_ids):
+            agent_index = agent_id_to_index.get(agent_id)
+            if agent_index is None:
+                agent_index = len(agent_id_to_index)
+                agent_id_to_index[agent_id] = agent_index
+                agent_type_values.append(
+                    chunk_agent_type_values[first_indices[agent_code]])
+            agent_indices[agent_code] = agent_index
+        yield times, agent_indices[agent_codes], states
+
+
+def _iter_raw_telemetry_chunks(
+    path: Path
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                    np.ndarray]]:
+    """Reads the records of the binary or CSV telemetry file in chronological
+    chunks.
+
+    Args:
+        path: Path to the binary or CSV telemetry file.
+
+    Yields:
+        A tuple of the time of each record, the agent type of each record, the
+        agent code of each record, an object array mapping from the agent code
+        to the agent ID, and an array of shape (num_records, 6) containing the
+        position and velocity of each record. The agent codes are only valid
+        within each chunk.
+    """
+    if path.suffix != TELEMETRY_BINARY_FILE_EXTENSION:
+        for telemetry_df in pd.read_csv(path,
+                                        chunksize=_TELEMETRY_MEMMAP_CHUNK_SIZE):
+            agent_codes, agent_ids = pd.factorize(telemetry_df[Column.AGENT_ID])
+            yield (
+                telemetry_df[Column.TIME].to_numpy(dtype=np.float32),
+                telemetry_df[Column.AGENT_TYPE].to_numpy(),
+                agent_codes,
+                np.asarray(agent_ids, dtype=object),
+                telemetry_df[list(_TELEMETRY_STATE_COLUMNS)].to_numpy(
+                    dtype=np.float32),
+            )
+        return
+    if path.stat().st_size == 0:
+        return
+
+    with (open(path, "rb") as
+          f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data):
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        try:
+            record_offsets = _index_telemetry_records(data, path)
+            for start in range(0, len(record_offsets),
+                               _TELEMETRY_MEMMAP_CHUNK_SIZE):
+                yield _decode_telemetry_records(
+                    data, buffer,
+                    record_offsets[start:start + _TELEMETRY_MEMMAP_CHUNK_SIZE])
+        finally:
+            # Release the buffer, so that the memory map can be closed.
+            del buffer
+
+
+def _index_telemetry_records(data: bytes, path: str | Path) -> np.ndarray:
+    """Returns the byte offsets of all records in the binary telemetry file.
+
+    The records have a variable length due to the agent ID, so the record
+    boundaries can only be found by following the length prefixes. Since
+    consecutive telemetry ticks usually contain the same agents in the same
+    order, the records of each tick are speculatively assumed to have the same
+    agent ID lengths as the last complete tick, and the length prefixes are
+    checked in a single vectorized operation. Only the records following the
+    first mismatch are scanned sequentially.
+
+    A truncated last record, e.g., from a worker that was killed, is ignored.
+
+    Args:
+        data: Contents of the binary telemetry file.
+        path: Path to the binary telemetry file.
+
+    Returns:
+        An array containing the byte offset of each record.
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    size = len(data)
+    record_offsets: list[np.ndarray] = []
+    tick_agent_id_lengths = np.empty(0, dtype=np.int64)
+    is_at_tick_start = True
+    offset = 0
+    while offset < size:
+        if tick_agent_id_lengths.size > 0:
+            record_sizes = tick_agent_id_lengths + _TELEMETRY_MIN_RECORD_SIZE
+            record_ends = offset + np.cumsum(record_sizes)
+            num_records = np.searchsorted(record_ends, size, side="right")
+            record_starts = (record_ends[:num_records] -
+                             record_sizes[:num_records])
+            matches = (buffer[record_starts + _TELEMETRY_RECORD_HEADER_SIZE] ==
+                       tick_agent_id_lengths[:num_records])
+            num_matches = num_records if matches.all() else int(
+                np.argmin(matches))
+            if num_matches < len(tick_agent_id_lengths):
+                # Scan the rest of this tick and the entirety of the next
+                # tick to determine the new agent ID lengths.
+                tick_agent_id_lengths = np.empty(0, dtype=np.int64)
+                is_at_tick_start = num_matches == 0
+            if num_matches > 0:
+                record_offsets.append(record_starts[:num_matches])
+                offset = int(record_ends[num_matches - 1])
+                continue
+
+        tick_record_offsets, agent_id_lengths, next_offset = (
+            _scan_telemetry_tick(data, offset))
+        if next_offset == offset:
+            logging.warning(
+                "Ignoring truncated record at byte %d in the telemetry file: "
+                "%s.", offset, path)
+            break
+        record_offsets.append(tick_record_offsets)
+        if is_at_tick_start:
+            # Long agent IDs have a multi-byte length prefix, so the records
+            # of this tick cannot be used for speculation.
+            if np.all(agent_id_lengths < 0x80):
+                tick_agent_id_lengths = agent_id_lengths
+        is_at_tick_start = True
+        offset = next_offset
+    if not record_offsets:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(record_offsets)
+
+
+def _scan_telemetry_tick(
+    data: bytes,
+    offset: int,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Sequentially scans the records up to the end of the current telemetry
+    tick.
+
+    All records in the same tick share the same time.
+
+    Args:
+        data: Contents of the binary telemetry file.
+        offset: Byte offset of the first record to scan.
+
+    Returns:
+        A tuple of the offsets of the scanned records, the lengths of their
+        agent IDs in bytes, and the offset of the record following the last
+        scanned record.
+    """
+    record_offsets: list[int] = []
+    agent_id_lengths: list[int] = []
+    size = len(data)
+    tick_time = data[offset:offset + 4]
+    while (offset + _TELEMETRY_MIN_RECORD_SIZE <= size and
+           data[offset:offset + 4] == tick_time):
+        agent_id_length = data[offset + _TELEMETRY_RECORD_HEADER_SIZE]
+        if agent_id_length < 0x80:
+            next_offset = offset + _TELEMETRY_MIN_RECORD_SIZE + agent_id_length
+        else:
+            agent_id_offset, agent_id_length = _decode_string_length(
+                data, offset + _TELEMETRY_RECORD_HEADER_SIZE)
+            next_offset = (agent_id_offset + agent_id_length +
+                           _TELEMETRY_RECORD_STATE_SIZE)
+        if next_offset > size:
+            break
+        record_offsets.append(offset)
+        agent_id_lengths.append(agent_id_length)
+        offset = next_offset
+    return (
+        np.array(record_offsets, dtype=np.int64),
+        np.array(agent_id_lengths, dtype=np.int64),
+        offset,
+    )
+
+
+def _decode_string_length(data: bytes, offset: int) -> tuple[int, int]:
+    """Decodes the length prefix of a string written by a .NET BinaryWriter.
+
+    The string length is encoded as a 7-bit variable-length integer.
+
+    Args:
+        data: Byte buffer.
+        offset: Byte offset of the length prefix.
+
+    Returns:
+        A tuple of the byte offset of the string and the string length in bytes.
+    """
+    length = 0
+    shift = 0
+    while offset < len(data):
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            break
+    return offset, length
+
+
+def _decode_agent_id_lengths(
+    data: bytes,
+    buffer: np.ndarray,
+    record_offsets: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the byte offset and the length of the agent ID in each record.
+
+    Args:
+        data: Contents of the binary telemetry file.
+        buffer: Byte buffer of the binary telemetry file.
+        record_offsets: Byte offset of each record.
+
+    Returns:
+        A tuple of the offset of each agent ID and the length of each agent ID
+        in bytes.
+    """
+    length_offsets = record_offsets + _TELEMETRY_RECORD_HEADER_SIZE
+    agent_id_offsets = length_offsets + 1
+    agent_id_lengths = buffer[length_offsets].astype(np.int64)
+    # Agent IDs of at least 128 bytes have a multi-byte length prefix.
+    for index in np.flatnonzero(agent_id_lengths >= 0x80):
+        agent_id_offsets[index], agent_id_lengths[index] = (
+            _decode_string_length(data, int(length_offsets[index])))
+    return agent_id_offsets, agent_id_lengths
+
+
+def _gather_values(
+    buffer: np.ndarray,
+    offsets: np.ndarray,
+    dtype: np.dtype,
+    count: int,
+) -> np.ndarray:
+    """Gathers fixed-size values starting at the given byte offsets.
+
+    Args:
+        buffer: Byte buffer.
+        offsets: Byte offsets of the first value in each row.
+        dtype: Data type of the values.
+        count: Number of consecutive values in each row.
+
+    Returns:
+        An array of shape (len(offsets), count) containing the values.
+    """
+    if offsets.size == 0:
+        return np.empty((0, count), dtype=dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(buffer,
+                                                       dtype.itemsize * count)
+    return windows[offsets].view(dtype)
+
+
+def _factorize_agent_ids(
+    buffer: np.ndarray,
+    offsets: np.ndarray,
+    lengths: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes the agent IDs in the binary telemetry file as integer codes.
+
+    Each distinct agent ID is only decoded once.
+
+    Args:
+        buffer: Byte buffer.
+        offsets: Byte offset of each agent ID.
+        lengths: Length of each agent ID in bytes.
+
+    Returns:
+        A tuple of the agent code of each agent ID and an object array mapping
+        from the agent code to the agent ID.
+    """
+    agent_codes = np.zeros(len(offsets), dtype=np.int64)
+    agent_ids: list[str] = []
+    for length in np.unique(lengths):
+        mask = lengths == length
+        if length == 0:
+            agent_codes[mask] = len(agent_ids)
+            agent_ids.append("")
+            continue
+        raw_agent_ids = _gather_values(buffer, offsets[mask],
+                                       np.dtype(np.uint8), length)
+        codes, first_indices = _factorize_rows(raw_agent_ids)
+        agent_codes[mask] = codes + len(agent_ids)
+        agent_ids.extend(
+            raw_agent_ids[index].tobytes().decode() for index in first_indices)
+    return agent_codes, np.array(agent_ids, dtype=object)
+
+
+def _factorize_rows(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes each row of a 2D byte array as an integer code.
+
+    The rows are compared as 64-bit words, which is considerably faster than
+    comparing them as strings.
+
+    Args:
+        rows: Array of shape (num_rows, num_bytes).
+
+    Returns:
+        A tuple of the code of each row and the index of the first occurrence
+        of each code. Codes are assigned in the order of first occurrence.
+    """
+    num_rows, num_bytes = rows.shape
+    padded_rows = np.zeros((num_rows, -(-num_bytes // 8) * 8), dtype=np.uint8)
+    padded_rows[:, :num_bytes] = rows
+    codes = np.zeros(num_rows, dtype=np.int64)
+    for words in padded_rows.view(np.uint64).T:
+        word_codes, unique_words = pd.factorize(words)
+        codes, _ = pd.factorize(codes * len(unique_words) + word_codes)
+    max_codes = np.maximum.accumulate(codes)
+    first_indices = np.flatnonzero(
+        np.concatenate(([True], max_codes[1:] > max_codes[:-1])))
+    return codes, first_indices
@@ -0,0 +1,74 @@
+"""Tests for the log utility functions."""
+
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from absl.testing import absltest
+
+import utils
+from constants import Column
+
+# Header of an event log.
+EVENT_LOG_HEADER = "Time,PositionX,PositionY,PositionZ,Event,Details\n"
+
+
+class EventLogCacheTest(absltest.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.log_dir = Path(temp_dir.name)
+
+    def _write_event_log(self, run_index: int, rows: list[str]) -> Path:
+        """Writes an event log with the given rows into a run directory."""
+        run_dir = self.log_dir / f"run_{run_index}_seed_{run_index}"
+        run_dir.mkdir()
+        path = run_dir / f"sim_events_{run_index}.csv"
+        path.write_text(EVENT_LOG_HEADER + "".join(f"{row}\n" for row in rows))
+        return path
+
+    def test_round_trip_with_empty_event_log(self):
+        paths = [
+            self._write_event_log(1, [
+                "0.5,1.0,2.0,3.0,NEW_THREAT,Threat 1",
+                "1.5,4.0,5.0,6.0,INTERCEPTOR_HIT,Interceptor 1",
+            ]),
+            # An aborted or event-less run only writes the header.
+            self._write_event_log(2, []),
+            self._write_event_log(3, ["2.5,7.0,8.0,9.0,NEW_THREAT,Threat 2"]),
+        ]
+        cache = utils.EventLogCache(self.log_dir)
+        expected_dfs = [utils.read_event_log(path, cache) for path in paths]
+        cache.save()
+
+        cache = utils.EventLogCache(self.log_dir)
+        for path, expected_df in zip(paths, expected_dfs):
+            self.assertTrue(cache.contains(path))
+            df = utils.read_event_log(path, cache)
+            self.assertListEqual(list(df.columns), list(expected_df.columns))
+            self.assertLen(df, len(expected_df))
+            for column in (Column.TIME, Column.POSITION_X, Column.POSITION_Y,
+                           Column.POSITION_Z):
+                self.assertTrue(pd.api.types.is_float_dtype(df[column]),
+                                f"{column} of {path} is {df[column].dtype}.")
+            if not expected_df.empty:
+                pd.testing.assert_frame_equal(df, expected_df)
+
+    def test_round_trip_with_only_empty_event_logs(self):
+        paths = [self._write_event_log(1, []), self._write_event_log(2, [])]
+        cache = utils.EventLogCache(self.log_dir)
+        for path in paths:
+            utils.read_event_log(path, cache)
+        cache.save()
+
+        cache = utils.EventLogCache(self.log_dir)
+        for path in paths:
+            df = utils.read_event_log(path, cache)
+            self.assertEmpty(df)
+            self.assertIn(Column.TIME, df.columns)
+
+
+if __name__ == "__main__":
+    absltest.main()
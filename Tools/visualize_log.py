@@ -11,6 +11,7 @@ import unity_utils
 import utils
 from absl import app, flags, logging
 from constants import Column, EventType, get_agent_color
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
 FLAGS = flags.FLAGS
 
@@ -82,6 +83,49 @@ def log_event_summary(event_df: pd.DataFrame) -> None:
                      first_miss_time, last_miss_time)
 
 
+def _generate_trajectories(
+        telemetry_df: pd.DataFrame) -> dict[str, list[np.ndarray]]:
+    """Generates the trajectories of all agents grouped by color.
+
+    The samples are sorted once by agent and then by time into a single array,
+    which is then split into a view of the trajectory of each agent. The y and z
+    coordinates are swapped for plotting to conform to Unity's conventions.
+
+    Args:
+        telemetry_df: Dataframe containing the telemetry data.
+
+    Returns:
+        A dictionary mapping from the agent color to a list of arrays of shape
+        (num_samples, 3) containing the trajectories of all agents with that
+        color.
+    """
+    if telemetry_df.empty:
+        return {}
+    agent_codes, _ = pd.factorize(telemetry_df[Column.AGENT_ID])
+    agent_type_codes, agent_types = pd.factorize(
+        telemetry_df[Column.AGENT_TYPE])
+    agent_type_colors = np.array(
+        [get_agent_color(agent_type) for agent_type in agent_types],
+        dtype=object)
+    order = np.lexsort((telemetry_df[Column.TIME].to_numpy(), agent_codes))
+    points = telemetry_df[[
+        Column.POSITION_X,
+        Column.POSITION_Z,
+        Column.POSITION_Y,
+    ]].to_numpy(dtype=np.float64)[order]
+    agent_codes = agent_codes[order]
+
+    # Split the samples at the first sample of each agent.
+    agent_starts = np.flatnonzero(
+        np.concatenate(([True], agent_codes[1:] != agent_codes[:-1])))
+    agent_colors = agent_type_colors[agent_type_codes[order[agent_starts]]]
+    trajectories: dict[str, list[np.ndarray]] = {}
+    for color, trajectory in zip(agent_colors, np.split(points,
+                                                        agent_starts[1:])):
+        trajectories.setdefault(color, []).append(trajectory)
+    return trajectories
+
+
 def plot_telemetry(telemetry_df: pd.DataFrame, event_df: pd.DataFrame) -> None:
     """Plots the trajectories in the telemetry data and the events.
 
@@ -94,19 +138,20 @@ def plot_telemetry(telemetry_df: pd.DataFrame, event_df: pd.DataFrame) -> None:
         subplot_kw={"projection": "3d"},
     )
 
-    # Plot the agent trajectories.
-    for _, agent_data in telemetry_df.groupby(Column.AGENT_ID):
-        agent_type = agent_data[Column.AGENT_TYPE].iloc[0]
-        color = get_agent_color(agent_type)
-
-        ax.plot(
-            agent_data[Column.POSITION_X],
-            agent_data[Column.POSITION_Z],
-            agent_data[Column.POSITION_Y],
-            color=color,
-            alpha=0.5,
-            linewidth=0.5,
-        )
+    # Plot the agent trajectories with a single line collection per color.
+    for color, trajectories in _generate_trajectories(telemetry_df).items():
+        ax.add_collection3d(
+            Line3DCollection(
+                trajectories,
+                colors=color,
+                alpha=0.5,
+                linewidths=0.5,
+            ))
+    ax.auto_scale_xyz(
+        telemetry_df[Column.POSITION_X],
+        telemetry_df[Column.POSITION_Z],
+        telemetry_df[Column.POSITION_Y],
+    )
 
     # Plot the events.
     for event_type, event_marker in EVENT_TYPE_TO_MARKER.items():
@@ -158,6 +203,12 @@ def main(argv):
 
     telemetry_df = utils.read_telemetry_file(telemetry_file_path)
     event_df = utils.read_event_log(event_log_path)
+    num_samples = len(telemetry_df)
+    telemetry_df = utils.simplify_trajectories(telemetry_df,
+                                               FLAGS.simplify_tolerance,
+                                               event_df)
+    logging.info("Simplified the trajectories from %d to %d samples.",
+                 num_samples, len(telemetry_df))
 
     log_event_summary(event_df)
     plot_telemetry(telemetry_df, event_df)
@@ -165,10 +216,17 @@ def main(argv):
 
 if __name__ == "__main__":
     flags.DEFINE_string("telemetry_file", None,
-                        "Path to the telemetry CSV file.")
+                        "Path to the telemetry binary or CSV file.")
     flags.DEFINE_string("event_log", None, "Path to the event CSV log.")
     flags.DEFINE_string("log_search_dir",
                         unity_utils.get_persistent_data_directory(),
                         "Log directory in which to search for logs.")
+    flags.DEFINE_float(
+        "simplify_tolerance",
+        0.0,
+        "Maximum position error in meters when simplifying the trajectories "
+        "before plotting. If 0, all telemetry samples are plotted.",
+        lower_bound=0.0,
+    )
 
     app.run(main)